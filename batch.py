@@ -0,0 +1,419 @@
+"""
+Batch generator for parameter sweeps.
+
+Expands a sweep spec into (tile, parameters) jobs and builds them on a
+process pool, one headless interpreter per worker.  Every job writes into
+its own directory; a failing job is recorded and the rest carry on.
+
+    python batch.py sweep.json -o out -j 8
+    python batch.py --tiles tabl,pange --set side=1.5,2 --set WIDTH=0.25 \\
+                    --scale 1,1.1 --units inch -o out
+
+A sweep spec is a JSON object, every key optional:
+
+    {
+      "tiles":   ["tabl", "pange"],        # default: all five
+      "units":   "inch",                   # lengths in "mm" (default) or "inch"
+      "params":  {"THICK": 0.3},           # fixed overrides for every job
+      "sweep":   {"side": [1.5, 2.0],      # one job per combination
+                  "WIDTH": [0.25, 0.3]},
+      "scale":   [1.0, 1.1],               # clay shrinkage: scales every length
+      "formats": ["brep", "stl"],          # any of brep, stl, 3mf
+      "outputs": ["tile", "filigree"]      # parts to build (default: all three)
+    }
+
+Parts left out of "outputs" (most often the mold) are never computed.
+
+Each job closes the documents it opened and drops its shapes, and a worker
+that still grows past ``GIRIH_RSS_MB`` (``--rss-limit``) is replaced by a
+fresh one, so memory stays flat however long the run.  With ``--stream``
+the results go to ``results.jsonl`` as they finish rather than being kept
+for ``summary.json``.
+
+The interpreter running this (and its workers) must be able to
+``import FreeCAD``, e.g. ``FreeCADCmd`` or a Python with FreeCAD's lib
+directory on ``sys.path``.
+"""
+import argparse
+import gc
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import time
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TILES = ("tabl", "pange", "torange", "sheshband", "sormehdan")
+FORMATS = ("brep", "stl", "3mf")
+OUTPUTS = ("tile", "filigree", "mold")
+INCH = 25.4
+
+# Workers whose resident memory passes this many MB after a job are
+# replaced by fresh ones; 0 never replaces them.
+RSS_LIMIT_MB = float(os.environ.get("GIRIH_RSS_MB", 2048))
+WORKER_POLL = 1.0               # seconds between checks for dead workers
+
+# Parameters that are lengths, so they follow "units" and "scale".
+LENGTH_KEYS = ("side", "THICK", "RECESS", "EMBEDDING", "WIDTH", "MOLD_BUFFER")
+# Every key of girih.DEFAULTS, here so specs can be checked without FreeCAD.
+PARAMS = LENGTH_KEYS + ("ANG", "LINE_COLOR", "TILE_COLOR")
+
+
+# ─── Sweep spec → jobs ─────────────────────────────────────────────────────────
+
+def _label(key, value):
+    return "%s-%g" % (key, value) if isinstance(value, (int, float)) else "%s-%s" % (key, value)
+
+
+def expand(spec):
+    """
+    List of jobs for ``spec``.  A job is a dict with the tile ``name``, its
+    ``params`` in mm, a ``label`` naming the swept values, the ``formats``
+    to write and the ``outputs`` to build.
+    """
+    tiles = spec.get("tiles") or TILES
+    unknown = set(tiles) - set(TILES)
+    if unknown:
+        raise ValueError("Unknown tile(s): %s" % ", ".join(sorted(unknown)))
+    formats = spec.get("formats") or ("brep", "stl")
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError("Unknown format(s): %s" % ", ".join(sorted(unknown)))
+    outputs = spec.get("outputs") or OUTPUTS
+    unknown = set(outputs) - set(OUTPUTS)
+    if unknown:
+        raise ValueError("Unknown output(s): %s" % ", ".join(sorted(unknown)))
+
+    unit = {"mm": 1.0, "inch": INCH}[spec.get("units", "mm")]
+    fixed = dict(spec.get("params", {}))
+    sweep = dict(spec.get("sweep", {}))
+    scales = spec.get("scale") or [1.0]
+    keys = sorted(sweep)
+
+    jobs = []
+    for name in tiles:
+        for values in itertools.product(*(sweep[k] for k in keys)):
+            for scale in scales:
+                params = dict(fixed, **dict(zip(keys, values)))
+                for k in LENGTH_KEYS:
+                    if k in params:
+                        params[k] *= unit
+                labels = [_label(k, v) for k, v in zip(keys, values)]
+                if len(scales) > 1 or scale != 1.0:
+                    labels.append(_label("scale", scale))
+                jobs.append({"name": name, "params": params, "scale": scale,
+                             "label": "_".join(labels) or "default",
+                             "formats": list(formats), "outputs": list(outputs)})
+    return jobs
+
+
+def scaled_params(job):
+    """Full mm parameters of ``job``, defaults filled in and ``scale`` applied."""
+    import girih
+    p = girih.tile_params(job["name"], job["params"])
+    for k in LENGTH_KEYS:
+        p[k] *= job["scale"]
+    return p
+
+
+# ─── Running one job (in a worker) ─────────────────────────────────────────────
+
+def run_job(job, out_dir):
+    """
+    Build ``job`` and write its files to ``<out_dir>/<tile>/<label>``.
+    Never raises: the result records ``"ok"`` or ``"failed"`` and the error.
+    Documents the job opened are closed and its shapes freed before it
+    returns, so a worker's memory does not grow from job to job.
+    """
+    directory = os.path.join(out_dir, job["name"], job["label"])
+    result = {"name": job["name"], "label": job["label"], "directory": directory,
+              "files": []}
+    start = time.perf_counter()
+    documents = _documents()
+    import instrument
+    try:
+        import shapecache
+
+        p = scaled_params(job)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "params.json"), "w") as fh:
+            json.dump(p, fh, indent=2, sort_keys=True)
+
+        before = dict(shapecache.STATS)
+        profiled = len(instrument.RECORDS)
+        result["files"] = _write_outputs(job, p, directory)
+        result["cache"] = {k: shapecache.STATS[k] - before[k] for k in before}
+        if instrument.ENABLED:
+            result["profile"] = instrument.RECORDS[profiled:]
+        del instrument.RECORDS[profiled:]
+        result["status"] = "ok"
+    except Exception as exc:
+        result["status"] = "failed"
+        result["error"] = "%s: %s" % (type(exc).__name__, exc)
+        result["traceback"] = traceback.format_exc()
+    _teardown(documents)
+    result["seconds"] = time.perf_counter() - start
+    result["rss_mb"] = instrument.rss_mb()
+    return result
+
+
+def _write_outputs(job, p, directory):
+    """Build and export ``job``; returns the paths written.  Its shapes die with it."""
+    import girih
+    import meshwriter
+    import shapecache
+
+    files = []
+    parts = girih.select_parts(job.get("outputs"))
+    if "brep" in job["formats"]:
+        shapes = girih.build_tile(job["name"], p, meshes="stl" in job["formats"],
+                                  outputs=parts)
+        for part, shape in zip(girih.PARTS, shapes):
+            if shape is None:
+                continue
+            path = os.path.join(directory, part + ".brep")
+            shape.exportBrep(path)
+            files.append(path)
+    if "stl" in job["formats"]:
+        cached = {}
+        if shapecache.ENABLED:
+            cached = shapecache.mesh_paths(girih.cache_key(job["name"], p))
+        if all(part in cached for part in parts):
+            for part in parts:
+                files.append(shutil.copy(cached[part], os.path.join(directory, part + ".stl")))
+        else:
+            files += meshwriter.export_tile(job["name"], p, directory, "stl", parts)
+    if "3mf" in job["formats"]:
+        files += meshwriter.export_tile(job["name"], p, directory, "3mf", parts)
+    return files
+
+
+def _documents():
+    """Names of the open FreeCAD documents, if FreeCAD is loaded."""
+    App = sys.modules.get("FreeCAD")
+    return set(App.listDocuments()) if App is not None else set()
+
+
+def _teardown(documents):
+    """Close every document opened since ``documents`` and collect the garbage."""
+    App = sys.modules.get("FreeCAD")
+    if App is not None:
+        for name in set(App.listDocuments()) - documents:
+            App.closeDocument(name)
+    gc.collect()
+
+
+# ─── Workers ───────────────────────────────────────────────────────────────────
+
+def _worker(tasks, results, out_dir, rss_limit):
+    """Run jobs from ``tasks`` until told to stop or grown past ``rss_limit`` MB."""
+    for i, job in iter(tasks.get, None):
+        result = run_job(job, out_dir)
+        recycle = bool(rss_limit) and (result["rss_mb"] or 0) > rss_limit
+        results.put((os.getpid(), i, result, recycle))
+        if recycle:
+            return
+
+
+def _progress(done, total, result, stream=sys.stderr):
+    status = result["status"]
+    if status != "ok":
+        status += " (%s)" % result["error"]
+    stream.write("[%*d/%d] %-10s %-40s %6.1fs  %s\n" % (
+        len(str(total)), done, total, result["name"], result["label"],
+        result.get("seconds", 0.0), status))
+    stream.flush()
+
+
+def _died(job, out_dir):
+    return {"name": job["name"], "label": job["label"],
+            "directory": os.path.join(out_dir, job["name"], job["label"]),
+            "files": [], "status": "failed", "error": "worker process died"}
+
+
+def stream_batch(jobs, out_dir, workers=None, rss_limit=RSS_LIMIT_MB):
+    """
+    Run ``jobs`` (any iterable) on worker processes and yield ``(index,
+    result)`` as each finishes, so results can be written out as they come
+    instead of held.  Jobs are handed out one at a time, never queued ahead.
+
+    A worker whose resident memory has grown past ``rss_limit`` MB after a
+    job (0: no limit) exits and is replaced by a fresh one.  A worker that
+    dies outright (a crash inside OCC) fails just the job it was running.
+    """
+    ctx = multiprocessing.get_context()
+    results = ctx.Queue()
+
+    def spawn():
+        tasks = ctx.Queue()
+        proc = ctx.Process(target=_worker, args=(tasks, results, out_dir, rss_limit),
+                           daemon=True)
+        proc.start()
+        return proc, tasks
+
+    todo = enumerate(jobs)
+    idle = [spawn() for _ in range(workers or os.cpu_count() or 1)]
+    busy = {}                                     # pid: (worker, (index, job))
+    try:
+        while True:
+            while idle:
+                task = next(todo, None)
+                if task is None:
+                    break
+                worker = idle.pop()
+                worker[1].put(task)
+                busy[worker[0].pid] = (worker, task)
+            if not busy:
+                return
+            try:
+                pid, i, result, recycle = results.get(timeout=WORKER_POLL)
+            except queue.Empty:
+                for pid, (worker, (i, job)) in list(busy.items()):
+                    if not worker[0].is_alive():
+                        del busy[pid]
+                        idle.append(spawn())
+                        yield i, _died(job, out_dir)
+                continue
+            if pid not in busy:                   # already given up for dead
+                continue
+            worker, _ = busy.pop(pid)
+            if recycle:
+                worker[0].join()
+                idle.append(spawn())
+            else:
+                idle.append(worker)
+            yield i, result
+    finally:
+        for proc, tasks in idle:
+            tasks.put(None)
+        for proc, tasks in idle:
+            proc.join(WORKER_POLL)
+        for proc, _ in idle + [worker for worker, _ in busy.values()]:
+            if proc.is_alive():
+                proc.terminate()
+
+
+def run_batch(jobs, out_dir, workers=None, progress=_progress, rss_limit=RSS_LIMIT_MB):
+    """Run ``jobs`` (see ``stream_batch``) and return their results in job order."""
+    results = [None] * len(jobs)
+    for done, (i, result) in enumerate(stream_batch(jobs, out_dir, workers, rss_limit), 1):
+        results[i] = result
+        progress(done, len(jobs), result)
+    return results
+
+
+# ─── Command line ──────────────────────────────────────────────────────────────
+
+def _numbers(text):
+    return [float(v) for v in text.split(",") if v]
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Build Girih tiles over a parameter sweep.")
+    ap.add_argument("spec", nargs="?", help="sweep spec (JSON file)")
+    ap.add_argument("-o", "--out", default="girih_out", help="output directory")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="worker processes (default: one per CPU)")
+    ap.add_argument("--tiles", help="comma-separated tile names")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=V1,V2",
+                    help="sweep a parameter over the given values")
+    ap.add_argument("--scale", type=_numbers, help="comma-separated shrinkage scales")
+    ap.add_argument("--units", choices=("mm", "inch"), help="units of length values")
+    ap.add_argument("--formats", help="comma-separated output formats: brep, stl, 3mf")
+    ap.add_argument("--outputs", help="comma-separated parts to build: tile, filigree, mold")
+    ap.add_argument("--stream", action="store_true",
+                    help="write each result to results.jsonl as it finishes instead of "
+                         "keeping them for summary.json (for very long runs)")
+    ap.add_argument("--rss-limit", type=float, default=RSS_LIMIT_MB, metavar="MB",
+                    help="replace a worker once it uses this much memory (0: never; "
+                         "default %(default)g)")
+    return ap.parse_args(argv)
+
+
+def spec_from_args(args):
+    """The sweep spec from the JSON file, overridden by command-line flags."""
+    spec = {}
+    if args.spec:
+        with open(args.spec) as fh:
+            spec = json.load(fh)
+    if args.tiles:
+        spec["tiles"] = args.tiles.split(",")
+    for item in args.set:
+        key, _, values = item.partition("=")
+        spec.setdefault("sweep", {})[key] = _numbers(values)
+    if args.scale:
+        spec["scale"] = args.scale
+    if args.units:
+        spec["units"] = args.units
+    if args.formats:
+        spec["formats"] = args.formats.split(",")
+    if args.outputs:
+        spec["outputs"] = args.outputs.split(",")
+    return spec
+
+
+def stream_results(path, jobs, out_dir, workers=None, rss_limit=RSS_LIMIT_MB,
+                   progress=_progress):
+    """
+    Run ``jobs``, appending each result to ``path`` as one JSON line as soon
+    as it finishes; nothing is kept.  Returns the totals: jobs ok and failed
+    and the summed cache counters.
+    """
+    totals = {"ok": 0, "failed": 0, "cache": {}}
+    with open(path, "w") as fh:
+        for done, (i, result) in enumerate(stream_batch(jobs, out_dir, workers, rss_limit), 1):
+            totals["ok" if result["status"] == "ok" else "failed"] += 1
+            for k, n in result.get("cache", {}).items():
+                totals["cache"][k] = totals["cache"].get(k, 0) + n
+            fh.write(json.dumps(dict(result, index=i)) + "\n")
+            fh.flush()
+            progress(done, len(jobs), result)
+    return totals
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = expand(spec_from_args(args))
+    sys.stderr.write("%d job(s) → %s\n" % (len(jobs), args.out))
+
+    start = time.perf_counter()
+    os.makedirs(args.out, exist_ok=True)
+    if args.stream:
+        path = os.path.join(args.out, "results.jsonl")
+        totals = stream_results(path, jobs, args.out, args.jobs, args.rss_limit)
+        with open(os.path.join(args.out, "summary.json"), "w") as fh:
+            json.dump(dict(totals, seconds=time.perf_counter() - start, results=path),
+                      fh, indent=2)
+        sys.stderr.write("%d ok, %d failed in %.1fs\n" % (
+            totals["ok"], totals["failed"], time.perf_counter() - start))
+        return 1 if totals["failed"] else 0
+
+    results = run_batch(jobs, args.out, args.jobs, rss_limit=args.rss_limit)
+    failed = [r for r in results if r["status"] != "ok"]
+
+    import instrument
+    if instrument.ENABLED:
+        records = [dict(r, tile="%s/%s" % (r["tile"], res["label"]))
+                   for res in results for r in res.pop("profile", [])]
+        instrument.write(os.path.join(args.out, "profile.csv"), records)
+        with open(os.path.join(args.out, "profile_summary.json"), "w") as fh:
+            json.dump(instrument.aggregate(records), fh, indent=2, sort_keys=True)
+    with open(os.path.join(args.out, "summary.json"), "w") as fh:
+        json.dump({"seconds": time.perf_counter() - start, "jobs": results}, fh, indent=2)
+    sys.stderr.write("%d ok, %d failed in %.1fs\n" % (
+        len(results) - len(failed), len(failed), time.perf_counter() - start))
+    import shapecache
+    if shapecache.ENABLED:
+        totals = {k: sum(r.get("cache", {}).get(k, 0) for r in results)
+                  for k in shapecache.STATS}
+        sys.stderr.write(shapecache.report(totals) + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
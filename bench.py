@@ -0,0 +1,245 @@
+"""
+Benchmark harness for the tile builders.
+
+Builds each tile headlessly at a fixed set of parameter points and times
+every stage on its own:
+
+    walk       the tile layout: outline, wedge bars and mold outline
+    prisms     the bars (solids in the 3D engine, outlines in the 2D one)
+    union      the filigree union
+    tile_cut   the base tile with its groove
+    mold       the mold block minus the cavity
+    export     BREP of the three shapes plus STL through meshwriter
+
+Each stage is repeated and reported as median, p10 and p90.  Every run is
+appended to a JSON-lines history file; ``--save-baseline`` stores the run
+as the baseline and later runs flag any stage whose median got slower than
+the baseline by more than ``--tolerance``.
+
+    python bench.py                      # run, append to bench_history.jsonl
+    python bench.py --save-baseline      # ... and make it the baseline
+    python bench.py -t tabl -r 9         # one tile, more repeats
+
+The shape cache is bypassed, and the prism memo is cleared before every
+run so the prisms stage times building them.  Exits with status 1 when a regression is found.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import girih
+import meshwriter
+import strapwork
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(HERE, "bench_history.jsonl")
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+STAGES = ("walk", "prisms", "union", "tile_cut", "mold", "export")
+
+# Fixed parameter points: the default tile plus a small and a large one.
+POINTS = {
+    "default": {},
+    "small":   {"side": 1.0 * girih.INCH, "WIDTH": 0.15 * girih.INCH},
+    "large":   {"side": 4.0 * girih.INCH, "WIDTH": 0.4 * girih.INCH},
+}
+
+# A stage counts as regressed when its median is this much slower than the
+# baseline's and also slower by at least MIN_REGRESSION seconds, so that
+# sub-millisecond jitter is not reported.
+TOLERANCE = 0.15
+MIN_REGRESSION = 0.002
+
+
+# ─── One build, stage by stage ─────────────────────────────────────────────────
+
+def _stages(name, p, engine, out_dir):
+    """Run one build, yielding ``(stage, seconds)`` as each stage finishes."""
+    clock = time.perf_counter
+
+    start = clock()
+    verts, wedge, mold_verts = girih.LAYOUTS[name](p)
+    yield "walk", clock() - start
+
+    symmetry = girih.SYMMETRY[name]
+    if engine == "2d":
+        outline = [(v.x, v.y) for v in verts]
+        start = clock()
+        polys = strapwork.filigree_polygons(p, wedge, symmetry)
+        yield "prisms", clock() - start
+
+        start = clock()
+        straps = strapwork.union_faces(polys)
+        filigree = strapwork.filigree_solid(p, straps)
+        yield "union", clock() - start
+
+        start = clock()
+        tile = strapwork.base_tile(p, outline, straps)
+        yield "tile_cut", clock() - start
+    else:
+        girih._prisms.clear()           # time building them, not memo hits
+        start = clock()
+        prisms = girih.make_prisms(p, wedge)
+        yield "prisms", clock() - start
+
+        start = clock()
+        filigree = girih.fuse_filigree(p, prisms, symmetry)
+        yield "union", clock() - start
+
+        start = clock()
+        raw_tile = girih.extrude_polygon(verts, p["THICK"] - p["RECESS"])
+        tile = girih.cut_groove(raw_tile, filigree)
+        yield "tile_cut", clock() - start
+
+    start = clock()
+    if engine != "2d":
+        straps = strapwork.strap_region(p, wedge, symmetry)
+    mold = girih.finish_mold(girih.mold_body(name, p, mold_verts),
+                             strapwork.mold_cavity(p, [(v.x, v.y) for v in verts], straps))
+    yield "mold", clock() - start
+
+    start = clock()
+    for part, shape in zip(meshwriter.PARTS, (tile, filigree, mold)):
+        shape.exportBrep(os.path.join(out_dir, part + ".brep"))
+    meshwriter.export_tile(name, p, out_dir, "stl")
+    yield "export", clock() - start
+
+
+def summarize(samples):
+    """Median and 10th/90th percentiles of a list of timings."""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        deciles = statistics.quantiles(ordered, n=10, method="inclusive")
+        p10, p90 = deciles[0], deciles[-1]
+    else:
+        p10 = p90 = ordered[0]
+    return {"median": statistics.median(ordered), "p10": p10, "p90": p90,
+            "n": len(ordered)}
+
+
+def bench(tiles, points, repeats, warmup=1, engine=None):
+    """``{"<tile>/<point>": {stage: summary}}`` for every tile and point."""
+    engine = engine or girih.ENGINE
+    results = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name in tiles:
+            for label, params in points.items():
+                p = girih.tile_params(name, params)
+                samples = {stage: [] for stage in STAGES}
+                for i in range(warmup + repeats):
+                    timings = dict(_stages(name, p, engine, out_dir))
+                    if i >= warmup:
+                        for stage, seconds in timings.items():
+                            samples[stage].append(seconds)
+                results["%s/%s" % (name, label)] = {
+                    stage: summarize(s) for stage, s in samples.items()}
+                sys.stderr.write(".")
+                sys.stderr.flush()
+    sys.stderr.write("\n")
+    return results
+
+
+# ─── History and baseline ──────────────────────────────────────────────────────
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_record(results, repeats, engine):
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "engine": engine,
+        "union": girih.UNION,
+        "repeats": repeats,
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "results": results,
+    }
+
+
+def regressions(results, baseline, tolerance=TOLERANCE):
+    """``[(case, stage, baseline median, median), ...]`` that got slower."""
+    slower = []
+    for case, stages in results.items():
+        for stage, summary in stages.items():
+            old = baseline.get(case, {}).get(stage)
+            if old is None:
+                continue
+            new, before = summary["median"], old["median"]
+            if new > before * (1 + tolerance) and new - before > MIN_REGRESSION:
+                slower.append((case, stage, before, new))
+    return slower
+
+
+def report(results, baseline=None, stream=sys.stdout):
+    """Print a table of medians (ms) per case and stage, with the baseline ratio."""
+    stream.write("%-22s" % "case" + "".join("%12s" % s for s in STAGES) + "\n")
+    for case, stages in results.items():
+        cells = []
+        for stage in STAGES:
+            cell = "%.1f" % (1000 * stages[stage]["median"])
+            old = (baseline or {}).get(case, {}).get(stage)
+            if old and old["median"] > 0:
+                cell += " %+.0f%%" % (100 * (stages[stage]["median"] / old["median"] - 1))
+            cells.append("%12s" % cell)
+        stream.write("%-22s" % case + "".join(cells) + "\n")
+
+
+# ─── Command line ──────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the Girih tile builders.")
+    ap.add_argument("-t", "--tiles", default=",".join(girih.LAYOUTS),
+                    help="comma-separated tile names")
+    ap.add_argument("-p", "--points", default=",".join(POINTS),
+                    help="comma-separated parameter points: %s" % ", ".join(POINTS))
+    ap.add_argument("-r", "--repeats", type=int, default=5, help="timed repeats per case")
+    ap.add_argument("--engine", choices=girih.ENGINES, default=girih.ENGINE)
+    ap.add_argument("--history", default=HISTORY, help="JSON-lines history file")
+    ap.add_argument("--baseline", default=BASELINE, help="baseline file")
+    ap.add_argument("--save-baseline", action="store_true",
+                    help="store this run as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE,
+                    help="allowed slowdown of a median before it is flagged")
+    args = ap.parse_args(argv)
+
+    points = {k: POINTS[k] for k in args.points.split(",")}
+    results = bench(args.tiles.split(","), points, args.repeats, engine=args.engine)
+    record = run_record(results, args.repeats, args.engine)
+
+    with open(args.history, "a") as fh:
+        fh.write(json.dumps(record, sort_keys=True) + "\n")
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+    report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump(record, fh, indent=2, sort_keys=True)
+        print("baseline saved to %s" % args.baseline)
+        return 0
+
+    slower = regressions(results, baseline or {}, args.tolerance)
+    for case, stage, before, new in slower:
+        print("REGRESSION %s %s: %.1f ms -> %.1f ms" % (case, stage, 1000*before, 1000*new))
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
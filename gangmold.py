@@ -0,0 +1,111 @@
+"""
+Gang molds: one mold block holding many tile cavities.
+
+The cavities are laid out like a print plate (``nest.py``) with
+``MOLD_BUFFER`` between them, each tile type's cavity profiles — the tile
+outline and the strap outline, as in ``strapwork.mold_cavity`` — are
+computed once and placed, and the block is cut with all of them in a
+single boolean.  So a mold for twenty tiles costs little more than one.
+
+    import gangmold
+    layout = gangmold.layout({"pange": 6, "torange": 8})
+    mold = gangmold.build(layout)
+    mold.exportBrep("gang.brep")
+
+A layout is the usual list of ``(tile, x, y, rotation)`` entries, so a
+hand-made one (``patch.read_layout``) works as well, as long as the
+cavities are at least ``MOLD_BUFFER`` apart.  All cavities share one set
+of parameters.
+"""
+import argparse
+import math
+import os
+import sys
+
+import Part
+from FreeCAD import Base
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import girih
+import nest
+import strapwork
+
+
+# ─── Layout ────────────────────────────────────────────────────────────────────
+
+def layout(counts, params=None, width=None):
+    """
+    Lay out ``counts`` (``{tile: quantity}``) of cavities ``MOLD_BUFFER``
+    apart in a roughly square block, or in rows ``width`` mm wide.
+    """
+    p = girih.with_defaults(params)
+    found = nest.outlines(counts, p)
+    if width is None:
+        area = sum(n * abs(nest.polygon_area(found[name])) for name, n in counts.items())
+        widest = max(max(math.hypot(x, y) for x, y in found[name]) for name in counts)
+        width = max(1.3 * math.sqrt(area), 2 * widest + p["MOLD_BUFFER"])
+    plates = nest.nest(counts, found, bed=(width, math.inf), gap=p["MOLD_BUFFER"])
+    return plates[0]
+
+
+# ─── Mold ──────────────────────────────────────────────────────────────────────
+
+def _placed(shape, x, y, rotation):
+    shape = shape.copy()
+    shape.Placement = Base.Placement(Base.Vector(x, y, 0),
+                                     Base.Rotation(Base.Vector(0, 0, 1), rotation))
+    return shape
+
+
+def cavity_profiles(names, p):
+    """``{tile: (outline face, strap faces)}``, each built once."""
+    found = {}
+    for name in names:
+        verts, wedge, _ = girih.LAYOUTS[name](p)
+        straps = strapwork.strap_region(p, wedge, girih.SYMMETRY[name])
+        found[name] = (strapwork.polygon_face([(v.x, v.y) for v in verts]), straps)
+    return found
+
+
+def build(placed, params=None):
+    """
+    The gang mold for ``placed`` cavities (a layout), flipped for printing
+    like a single tile's mold.
+    """
+    p = girih.with_defaults(params)
+    with girih.instrument.section("gang", "build"):
+        profiles = cavity_profiles(dict.fromkeys(name for name, *_ in placed), p)
+        outlines, straps = [], []
+        for name, x, y, rotation in placed:
+            outline, region = profiles[name]
+            outlines.append(_placed(outline, x, y, rotation))
+            straps += [_placed(f, x, y, rotation) for f in region.Faces]
+
+        # The cavities never overlap, so their union is just the compound
+        top = p["THICK"] - p["RECESS"]
+        cavity = [strapwork.extrude_faces(Part.makeCompound(outlines), 0, top)]
+        if p["RECESS"] > 0:
+            cavity.append(strapwork.extrude_faces(Part.makeCompound(straps), top, p["RECESS"]))
+
+        box = Part.makeCompound(outlines).BoundBox
+        buf = p["MOLD_BUFFER"]
+        block = Part.makeBox(box.XLength + 2*buf, box.YLength + 2*buf, p["THICK"] + buf,
+                             Base.Vector(box.XMin - buf, box.YMin - buf, 0))
+        return girih.finish_mold(block, cavity)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build a mold block with many tile cavities.")
+    ap.add_argument("counts", type=nest.parse_counts, help="cavities, e.g. pange=6,torange=8")
+    ap.add_argument("--width", type=float, help="block width in mm (default: about square)")
+    ap.add_argument("-o", "--out", default="gang_mold.brep", help="BREP file to write")
+    args = ap.parse_args(argv)
+
+    placed = layout(args.counts, width=args.width)
+    build(placed).exportBrep(args.out)
+    sys.stderr.write("%d cavities → %s\n" % (len(placed), args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
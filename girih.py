@@ -0,0 +1,618 @@
+"""
+Headless builders for the five Girih tiles.
+
+Each ``build_<tile>(params)`` returns ``(tile_shape, filigree_shape,
+mold_shape)`` as plain ``Part.Shape`` objects.  Nothing here creates a
+document, touches a view provider or imports ``FreeCADGui``, so the
+builders run unchanged under ``FreeCADCmd``.  The scripts ``tabl.py``,
+``pange.py``, ``torange.py``, ``sheshband.py`` and ``sormehdan.py`` are thin
+wrappers that call these and put the results in a document.
+"""
+import math
+import os
+
+import Part
+from FreeCAD import Base
+
+import instrument
+import kernel
+import shapecache
+import strapwork
+from kernel import COS18, COS36, COS54, COS72, SIN18, SIN36, SIN54, SIN72, TAN18, TAN36
+from kernel import TORANGE_ANGLES
+
+# Bump whenever a change alters the shapes built from the same parameters;
+# it is part of every shape cache key.
+GENERATOR_VERSION = "1"
+
+# ─── Parameters you probably don't want to touch ───────────────────────────────
+INCH       = 25.4               # mm per inch
+ANG        = 36.0               # end-cut angle from perpendicular
+
+# ─── Default parameters ────────────────────────────────────────────────────────
+DEFAULTS = {
+    "side":        2.0 * INCH,      # 2″ side length
+    "THICK":       0.3 * INCH,      # tile thickness
+    "RECESS":      0.05 * INCH,     # 1 mm recess
+    "EMBEDDING":   0.05 * INCH,     # Embedding of lines into tile
+    "WIDTH":       0.25 * INCH,     # groove width
+    "MOLD_BUFFER": 0.25 * INCH,     # Min. thickness of mold
+    "ANG":         ANG,             # end-cut angle from perpendicular
+    "LINE_COLOR":  (171, 133, 70),  # rgb in decimal vector
+    "TILE_COLOR":  (94, 140, 125),  # rgb in decimal vector
+}
+
+# The Shesh Band has always been printed a little larger and deeper.
+SHESHBAND_DEFAULTS = dict(
+    DEFAULTS,
+    side=2.2 * INCH,
+    THICK=0.4 * INCH,
+    RECESS=0.1 * INCH,
+    EMBEDDING=0.04 * INCH,
+    WIDTH=0.3 * INCH,
+)
+
+
+def with_defaults(params=None, defaults=DEFAULTS):
+    """Return a full parameter dict: ``defaults`` overridden by ``params``."""
+    p = dict(defaults)
+    if params:
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise KeyError("Unknown tile parameter(s): %s" % ", ".join(sorted(unknown)))
+        p.update(params)
+    return p
+
+
+def rgb(color):
+    """Convert a decimal rgb triple to the 0–1 floats FreeCAD expects."""
+    return (color[0]/255, color[1]/255, color[2]/255)
+
+
+# ─── 2D profiles ───────────────────────────────────────────────────────────────
+
+def _vectors(points):
+    return [Base.Vector(float(x), float(y), 0) for x, y in points]
+
+
+def regular_polygon(n_sides, R, start_angle):
+    """Vertices of a regular polygon of circumradius R, first vertex at start_angle."""
+    return _vectors(kernel.regular_polygon(n_sides, R, start_angle))
+
+
+def walk_polygon(side, interior_angles, direction, center=True):
+    """
+    Walk the perimeter from (-side/2, 0), heading ``direction`` degrees, turning
+    inward by (180 - interior) at each corner.  Optionally re-center on origin.
+    """
+    return _vectors(kernel.walk(side, interior_angles, direction, center))
+
+
+def extrude_polygon(verts, height):
+    """Close ``verts`` into a face and extrude it by ``height`` along Z."""
+    wire = Part.makePolygon(verts + [verts[0]])
+    face = Part.Face(wire)
+    return face.extrude(Base.Vector(0, 0, height))
+
+
+# ─── Filigree ──────────────────────────────────────────────────────────────────
+
+# Prisms built so far, midpoint at the origin and along X, keyed by
+# (L, end angle 1, end angle 2, WIDTH, depth).  Shared by every tile built
+# in the process, so each distinct bar is extruded once; the least recently
+# used go first once there are more than PRISM_CACHE_SIZE.
+PRISM_CACHE_SIZE = 1024
+_prisms = {}
+
+
+def _prism_key(p, L, half1, half2):
+    ang = p["ANG"]
+    return tuple(round(float(v), 9) for v in (L, ang/2 if half1 else ang, ang/2 if half2 else ang,
+                                              p["WIDTH"], p["RECESS"] + p["EMBEDDING"]))
+
+
+def make_prisms(p, bars):
+    """
+    Trapezoidal prisms for many bars at once.  Each distinct bar is
+    extruded once, the corners of all new ones coming from a single
+    ``kernel.bar_corners`` call, and every bar is a placed copy of it.
+    """
+    keys = [_prism_key(p, L, half1, half2) for L, _, _, half1, half2 in bars]
+    built = {k: _prisms.pop(k) for k in keys if k in _prisms}   # reinserted as most recent
+    new = {k: (L, 0.0, (0.0, 0.0), half1, half2)
+           for k, (L, _, _, half1, half2) in zip(keys, bars) if k not in built}
+    if new:
+        corners = kernel.bar_corners(list(new.values()), p["WIDTH"], p["ANG"])
+        for k, c in zip(new, corners):
+            built[k] = extrude_polygon(_vectors(c), p["RECESS"] + p["EMBEDDING"])
+    for k, prism in built.items():
+        _prisms[k] = prism
+    while len(_prisms) > PRISM_CACHE_SIZE:
+        del _prisms[next(iter(_prisms))]
+    return [_placed_prism(built[k], rot, base) for k, (_, rot, base, _, _) in zip(keys, bars)]
+
+
+def _placed_prism(prism, rot, base):
+    """A copy of ``prism`` sharing its geometry, turned by ``rot`` and moved to ``base``."""
+    shp = prism.copy(False)
+    shp.Placement = Base.Placement(Base.Vector(float(base[0]), float(base[1]), 0),
+                                   Base.Rotation(Base.Vector(0, 0, 1), float(rot)))
+    return shp
+
+
+def make_prism(p, L, rot, base, half1=False, half2=False):
+    """
+    Create a trapezoidal prism (bar) of midpoint-to-midpoint length L,
+    rotated counterclockwise by ``rot`` degrees about Z, then the midpoint
+    is translated from the origin by ``base``.  ``half1``/``half2`` halve the
+    end-cut angle at the -X/+X end.
+    """
+    return make_prisms(p, [bar(L, rot, base, half1, half2)])[0]
+
+
+def bar(L, rot, base, half1=False, half2=False):
+    """A bar as data: the arguments ``make_prism`` takes after ``p``."""
+    return (L, rot, base, half1, half2)
+
+
+def mirror_prism(prism):
+    """Mirror a shape across the YZ plane (x → -x)."""
+    shp = prism.copy()
+    mirror_mat = Base.Matrix()
+    mirror_mat.A11 = -1  # flip X
+    shp.transformShape(mirror_mat)
+    return shp
+
+
+# ─── Boolean union ─────────────────────────────────────────────────────────────
+# "multi" does one generalized fuse of all operands, "tree" a balanced pairwise
+# reduction and "sequential" the original left fold.  Set GIRIH_UNION in the
+# environment to A/B the strategies without touching code.
+UNION_METHODS = ("multi", "tree", "sequential")
+UNION = os.environ.get("GIRIH_UNION", "multi")
+
+
+def fuse_all(shapes, method=None):
+    """Union ``shapes`` with the chosen strategy; removeSplitter runs once."""
+    method = method or UNION
+    if method not in UNION_METHODS:
+        raise ValueError("Unknown union method %r, expected one of %s"
+                         % (method, ", ".join(UNION_METHODS)))
+    return refine(_fuse(list(shapes), method))
+
+
+@instrument.timed("removeSplitter")
+def refine(shape):
+    return shape.removeSplitter()
+
+
+@instrument.timed("fuse")
+def _fuse(shapes, method):
+    if len(shapes) == 1:
+        fused = shapes[0]
+    elif method == "multi":
+        fused = shapes[0].multiFuse(shapes[1:])
+    elif method == "tree":
+        while len(shapes) > 1:
+            paired = [a.fuse(b) for a, b in zip(shapes[::2], shapes[1::2])]
+            if len(shapes) % 2:
+                paired.append(shapes[-1])
+            shapes = paired
+        fused = shapes[0]
+    else:
+        fused = shapes[0]
+        for s in shapes[1:]:
+            fused = fused.fuse(s)
+    return fused
+
+
+# ─── Symmetry ──────────────────────────────────────────────────────────────────
+# Every tile's strapwork is invariant under a rotation group C_n, or the
+# dihedral group D_n when it is also symmetric across the Y axis.  Each
+# builder only writes down the bars of one fundamental wedge; the rest of the
+# filigree is the images of that wedge.
+SYMMETRY = {
+    #            (n, mirror)
+    "tabl":      (10, True),
+    "pange":     (5,  True),
+    "torange":   (2,  False),
+    "sheshband": (2,  False),
+    "sormehdan": (2,  True),
+}
+
+
+def replicate(shape, n, mirror=False):
+    """Images of ``shape`` under C_n, or under D_n if ``mirror`` is set."""
+    images = []
+    for base in ([shape, mirror_prism(shape)] if mirror else [shape]):
+        for k in range(n):
+            img = base.copy(False)              # shares the geometry
+            img.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 360.0*k/n)
+            images.append(img)
+    return images
+
+
+def fuse_filigree(p, wedge, symmetry, method=None):
+    """
+    Fuse the bars of one fundamental wedge, union its images under
+    ``symmetry`` in a single operation, and lift the result onto the tile
+    surface.
+    """
+    n, mirror = symmetry
+    fused = fuse_all(wedge, method) if len(wedge) > 1 else wedge[0]
+    fused = fuse_all(replicate(fused, n, mirror), method)
+    fused.translate(Base.Vector(0, 0, p["THICK"] - p["RECESS"] - p["EMBEDDING"]))
+    return fused
+
+
+def star_bar(apothem, L):
+    """
+    The bar leaving the midpoint of the bottom edge of a regular polygon up
+    and to the left, with the half-angle cut where it meets the central star.
+    """
+    return bar(L, 126, (-L*COS54/2, -apothem + 0.5*L*SIN54, 0), half2=True)
+
+
+# ─── Tile and filigree ─────────────────────────────────────────────────────────
+# "2d" unions the strap outlines in the plane and extrudes once (strapwork.py);
+# "3d" extrudes every bar and fuses and cuts solids.  GIRIH_ENGINE overrides.
+ENGINES = ("2d", "3d")
+ENGINE = os.environ.get("GIRIH_ENGINE", "2d")
+
+
+def tile_and_filigree(p, verts, wedge, symmetry, engine=None, straps=None, parts=None):
+    """
+    Base tile and filigree from the tile outline and one wedge of bars.
+    The 2D engine reuses ``straps``, the unioned strap outline, if given.
+    Of the two, only those in ``parts`` are built; the other is None.
+    """
+    engine = engine or ENGINE
+    parts = parts or PARTS
+    if engine == "2d":
+        if straps is None:
+            straps = strapwork.strap_region(p, wedge, symmetry)
+        tile = filigree = None
+        if "BaseTile" in parts:
+            tile = strapwork.base_tile(p, [(v.x, v.y) for v in verts], straps)
+        if "Filigree" in parts:
+            filigree = strapwork.filigree_solid(p, straps)
+        return tile, filigree
+    if engine != "3d":
+        raise ValueError("Unknown engine %r, expected one of %s" % (engine, ", ".join(ENGINES)))
+
+    # The groove is cut with the filigree, so it is built either way
+    filigree = fuse_filigree(p, make_prisms(p, wedge), symmetry)
+    tile = None
+    if "BaseTile" in parts:
+        tile = cut_groove(extrude_polygon(verts, p["THICK"] - p["RECESS"]), filigree)
+    return tile, filigree if "Filigree" in parts else None
+
+
+@instrument.timed("groove_cut")
+def cut_groove(raw_tile, filigree):
+    return raw_tile.cut(filigree)
+
+
+# ─── Mold ──────────────────────────────────────────────────────────────────────
+# The Tabl mold is a true cylinder; in the plane it is stood in for by a
+# polygon with this many sides (used when meshing directly).
+MOLD_SEGMENTS = 128
+ROUND_MOLDS = ("tabl",)
+
+
+def finish_mold(mold_outer, cavity):
+    """
+    Cut the ``cavity`` solids (see ``strapwork.mold_cavity``) from the mold
+    body in one operation and flip it for printability.
+    """
+    mold = _mold_cut(mold_outer, cavity)
+    mold.rotate(Base.Vector(0, 0, 0), Base.Vector(1, 0, 0), 180)
+    return mold
+
+
+@instrument.timed("mold_cut")
+def _mold_cut(mold_outer, cavity):
+    return mold_outer.cut(cavity)
+
+
+def box_outline(verts, buf):
+    """A rectangle ``buf`` larger than the bounding box of ``verts``."""
+    min_x, max_x = min(v.x for v in verts) - buf, max(v.x for v in verts) + buf
+    min_y, max_y = min(v.y for v in verts) - buf, max(v.y for v in verts) + buf
+    return [Base.Vector(min_x, min_y, 0), Base.Vector(max_x, min_y, 0),
+            Base.Vector(max_x, max_y, 0), Base.Vector(min_x, max_y, 0)]
+
+
+# ─── Tile layouts ──────────────────────────────────────────────────────────────
+# A layout is everything a tile needs in the plane: its outline, the bars of
+# one fundamental wedge of its filigree, and the outline of its mold.
+
+def layout_tabl(p):
+    side = p["side"]
+
+    decagon_radius = side / (2 * SIN18)
+    apothem = side / (2 * TAN18)
+
+    verts = _vectors(kernel.outline("tabl", side))
+
+    # The line from the midpoint and the (imaginary) line from the corner to
+    # the center where the actual line ends form a symmetric triangle with
+    # inner angles of 54 degrees.
+    L = 0.5*apothem/COS36
+
+    # One bar generates all twenty under the decagon's D10 symmetry.
+    wedge = [star_bar(apothem, L)]
+
+    # Cylindrical mold that includes tile and filigree
+    mold_verts = regular_polygon(MOLD_SEGMENTS, decagon_radius + p["MOLD_BUFFER"], 0)
+    return verts, wedge, mold_verts
+
+
+def layout_pange(p):
+    side = p["side"]
+    n_sides = 5
+
+    # original flat‐top start: π/2 + π/5 ; add π to flip it
+    start_angle = math.pi/2 + math.pi/n_sides + math.pi
+    verts = _vectors(kernel.outline("pange", side))
+
+    apothem = side / (2 * TAN36)
+
+    # The line from the midpoint and the (imaginary) line from the corner to
+    # the center where the actual line ends form a symmetric triangle with
+    # inner angles of 54 degrees.  So the length of the line is just the
+    # length it takes for the line to cover half of the horizontal distance
+    # of the side.
+    L = 0.25*side/COS54
+
+    # One bar generates all ten under the pentagon's D5 symmetry.
+    wedge = [star_bar(apothem, L)]
+
+    # Pentagon mold from the tile profile grown by MOLD_BUFFER
+    mold_side = side + p["MOLD_BUFFER"]
+    mold_R = mold_side / (2 * SIN36)
+    mold_verts = regular_polygon(n_sides, mold_R, start_angle)
+    return verts, wedge, mold_verts
+
+
+def layout_torange(p):
+    side = p["side"]
+
+    verts = _vectors(kernel.outline("torange", side))
+
+    L1 = side*SIN36                 # longer lines (meeting edges on both ends)
+    L2 = 0.5*side*COS36/COS18
+
+    # The upper half; the lower half is its image under a half turn.
+    wedge = [
+        bar(L1, 90, (-0.5*side*COS36, 0, 0)),
+        bar(L2, -18, (-0.25*side*COS36, 0.5*L1 - 0.5*L2*SIN18, 0), half2=True),
+        bar(L2, 18, (0.25*side*COS36, 0.5*L1 - 0.5*L2*SIN18, 0), half1=True),
+    ]
+
+    # Diamond-shaped mold from the tile profile grown by MOLD_BUFFER
+    mold_verts = walk_polygon(side + p["MOLD_BUFFER"], TORANGE_ANGLES, 144)
+    return verts, wedge, mold_verts
+
+
+def layout_sheshband(p):
+    side = p["side"]
+
+    verts = _vectors(kernel.outline("sheshband", side))
+
+    L1 = side*SIN36
+    X  = 0.5*(side + side*COS36)
+
+    # The upper half; the lower half is its image under a half turn.
+    wedge = [
+        bar(L1, 90, (-X, 0, 0)),
+        bar(L1, -18, (-X + 0.5*L1*COS18, 0.5*L1*(1 - SIN18), 0)),
+        bar(L1, 54, (-0.5*L1*COS54, L1 - 0.5*L1*SIN54, 0)),
+        bar(L1, -54, (0.5*L1*COS54, L1 - 0.5*L1*SIN54, 0)),
+        bar(L1, 18, (X - 0.5*L1*COS18, 0.5*L1*(1 - SIN18), 0)),
+    ]
+
+    # Rectangular mold box around the tile
+    return verts, wedge, box_outline(verts, p["MOLD_BUFFER"])
+
+
+def layout_sormehdan(p):
+    side = p["side"]
+
+    verts = _vectors(kernel.outline("sormehdan", side))
+
+    L1_x = 0.5*side*COS18               # Half of one side X distance
+    L1_y = 0.5*(side - side*SIN18)      # Origin to halfway down side Y distance
+    L2_y = L1_y
+    L2_x = L2_y*COS72/SIN72
+    L1 = math.sqrt(L1_x*L1_x + L1_y*L1_y)   # Length of longer lines (meeting edges on both ends)
+    # Length of line at which midpoints touch
+    L2_m = math.sqrt(L2_x*L2_x + L2_y*L2_y)  # Length of shorter lines (meeting edges on one end)
+    # Extend line so edges touch
+    L2 = L2_m + (0.5*p["WIDTH"]/COS36)*SIN54/SIN72
+
+    # Adjust the line midpoint because we made it longer
+    dx = (L2 - L2_m) * COS72/2
+    dy = (L2 - L2_m) * SIN72/2
+
+    # One long and one short line from the lower left; D2 gives the other six.
+    # The two sets of lines are not contiguous, so the union is a compound of
+    # two solids.
+    wedge = [
+        bar(L1, 144, (-1.5*L1_x, -0.5*L1_y, 0)),
+        bar(L2, -108, (-L1_x + 0.5*L2_x + dx, -0.5*L1_y + dy, 0)),
+    ]
+
+    # Rectangular mold box around the tile and both filigree layers
+    return verts, wedge, box_outline(verts, p["MOLD_BUFFER"])
+
+
+LAYOUTS = {
+    "tabl":      layout_tabl,
+    "pange":     layout_pange,
+    "torange":   layout_torange,
+    "sheshband": layout_sheshband,
+    "sormehdan": layout_sormehdan,
+}
+
+TILE_DEFAULTS = {name: DEFAULTS for name in LAYOUTS}
+TILE_DEFAULTS["sheshband"] = SHESHBAND_DEFAULTS
+
+
+def tile_params(name, params=None):
+    """Full parameter dict for tile ``name``."""
+    if name not in LAYOUTS:
+        raise KeyError("Unknown tile %r, expected one of %s" % (name, ", ".join(LAYOUTS)))
+    return with_defaults(params, TILE_DEFAULTS[name])
+
+
+# ─── Output selection ──────────────────────────────────────────────────────────
+# A build makes only the parts asked for; the others come back as None and
+# are never computed.  The mold is by far the most expensive of the three.
+PARTS = shapecache.PARTS
+PART_ALIASES = {"tile": "BaseTile", "filigree": "Filigree", "mold": "MoldWithCavity"}
+
+
+def select_parts(outputs=None):
+    """
+    The part names for ``outputs``: part names or ``tile``/``filigree``/
+    ``mold``, as a sequence or a comma-separated string.  None means all.
+    """
+    if outputs is None:
+        return PARTS
+    if isinstance(outputs, str):
+        outputs = [o.strip() for o in outputs.split(",") if o.strip()]
+    wanted = {PART_ALIASES.get(o, o) for o in outputs}
+    unknown = wanted - set(PARTS)
+    if unknown or not wanted:
+        raise ValueError("Unknown output(s) %s, expected any of %s" % (
+            ", ".join(sorted(unknown)) or "(none)", ", ".join(PART_ALIASES)))
+    return tuple(part for part in PARTS if part in wanted)
+
+
+# ─── Builders ──────────────────────────────────────────────────────────────────
+
+def build_tile(name, params=None, meshes=False, outputs=None):
+    """
+    ``(tile, filigree, mold)`` shapes for the tile called ``name``, loaded
+    from the shape cache when the same tile was built before (shapecache.py).
+    Only the parts in ``outputs`` (see ``select_parts``) are built; the
+    others are None.  With ``meshes`` a cache miss also stores STL meshes
+    of the parts built.
+    """
+    p = tile_params(name, params)
+    parts = select_parts(outputs)
+    with instrument.section(name, "build"):
+        if shapecache.ENABLED:
+            mesher = None
+            if meshes:
+                import meshwriter
+                mesher = meshwriter.tile_meshes
+            return shapecache.cached(name, p, _build_tile, GENERATOR_VERSION, ENGINE, mesher,
+                                     parts=parts)
+        return _build_tile(name, p, parts)
+
+
+def cache_key(name, params=None):
+    """The shape cache key of tile ``name`` built from ``params``."""
+    return shapecache.key(name, tile_params(name, params), GENERATOR_VERSION, ENGINE)
+
+
+def _build_tile(name, p, parts=PARTS):
+    verts, wedge, mold_verts = LAYOUTS[name](p)
+    outline = [(v.x, v.y) for v in verts]
+
+    # The strap outline is needed for the mold cavity whichever engine
+    # builds the filigree; the 2D engine shares it.
+    straps = None
+    if "MoldWithCavity" in parts or ENGINE == "2d":
+        straps = strapwork.strap_region(p, wedge, SYMMETRY[name])
+    tile = filigree = mold = None
+    if "BaseTile" in parts or "Filigree" in parts:
+        tile, filigree = tile_and_filigree(p, verts, wedge, SYMMETRY[name], straps=straps,
+                                           parts=parts)
+    if "MoldWithCavity" in parts:
+        mold = finish_mold(mold_body(name, p, mold_verts),
+                           strapwork.mold_cavity(p, outline, straps))
+    return tile, filigree, mold
+
+
+def mold_body(name, p, mold_verts):
+    """The solid mold block, before the cavity is cut."""
+    height = p["THICK"] + p["MOLD_BUFFER"]
+    if name in ROUND_MOLDS:
+        return Part.makeCylinder(mold_verts[0].Length, height)
+    return extrude_polygon(mold_verts, height)
+
+
+def build_tabl(params=None, outputs=None):
+    return build_tile("tabl", params, outputs=outputs)
+
+
+def build_pange(params=None, outputs=None):
+    return build_tile("pange", params, outputs=outputs)
+
+
+def build_torange(params=None, outputs=None):
+    return build_tile("torange", params, outputs=outputs)
+
+
+def build_sheshband(params=None, outputs=None):
+    return build_tile("sheshband", params, outputs=outputs)
+
+
+def build_sormehdan(params=None, outputs=None):
+    return build_tile("sormehdan", params, outputs=outputs)
+
+
+BUILDERS = {
+    "tabl":      build_tabl,
+    "pange":     build_pange,
+    "torange":   build_torange,
+    "sheshband": build_sheshband,
+    "sormehdan": build_sormehdan,
+}
+
+
+def profiles(name, params=None):
+    """
+    The 2D profiles of tile ``name`` as plain (x, y) data, for consumers that
+    never need a solid (see meshwriter.py).  Returns ``(params, profiles)``
+    where ``profiles`` has the keys described in ``strapwork.profiles`` plus
+    ``"mold"``, the mold's outer outline.
+    """
+    p = tile_params(name, params)
+    verts, wedge, mold_verts = LAYOUTS[name](p)
+    prof = strapwork.profiles(p, [(v.x, v.y) for v in verts], wedge, SYMMETRY[name])
+    prof["mold"] = [(v.x, v.y) for v in mold_verts]
+    return p, prof
+
+
+# ─── Document helpers (used by the scripts) ────────────────────────────────────
+
+def add_to_document(doc, name, tile, filigree, mold, params=None):
+    """
+    Add the three shapes to ``doc`` as ``BaseTile``, ``Filigree`` and
+    ``MoldWithCavity`` in a group called ``name``; a shape that is None
+    (not built) is skipped and its object returned as None.  View colors
+    and visibility are only set when a GUI is present.
+    """
+    p = with_defaults(params)
+    colors = (rgb(p["TILE_COLOR"]), rgb(p["LINE_COLOR"]), (0.5, 0.5, 0.5))  # mold neutral gray
+
+    group = doc.addObject("App::DocumentObjectGroup", name)
+    objects = []
+    for part, shape, color in zip(PARTS, (tile, filigree, mold), colors):
+        if shape is None:
+            objects.append(None)
+            continue
+        obj = doc.addObject("Part::Feature", part)
+        obj.Shape = shape
+        if part != "MoldWithCavity":
+            group.addObject(obj)
+        if obj.ViewObject is not None:
+            obj.ViewObject.ShapeColor = color
+            # show tile and filigree, hide mold
+            obj.ViewObject.Visibility = part != "MoldWithCavity"
+        objects.append(obj)
+    return tuple(objects)
@@ -0,0 +1,163 @@
+"""
+Stage-level timing for tile builds.
+
+Set ``GIRIH_PROFILE`` before ``girih`` is imported to record, for every
+instrumented stage (the fuses, removeSplitter, the groove cut, the mold
+booleans, ``doc.recompute()``...), its wall time, the peak RSS of the
+process after it and the face/edge counts of its input and output shapes.
+
+    GIRIH_PROFILE=1              record; read them from ``RECORDS``
+    GIRIH_PROFILE=profile.json   ... and write them there at exit
+    GIRIH_PROFILE=profile.csv    ... as CSV
+
+With it unset, ``timed`` hands back the undecorated function, so the
+builders run exactly the code they would without this module.
+"""
+import atexit
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:                 # Windows
+    resource = None
+
+_SETTING = os.environ.get("GIRIH_PROFILE", "")
+ENABLED = _SETTING.lower() not in ("", "0", "off", "no")
+
+RECORDS = []
+FIELDS = ("tile", "stage", "seconds", "peak_rss_mb",
+          "faces_in", "edges_in", "faces_out", "edges_out")
+
+_context = []                       # labels of the enclosing sections
+
+
+# ─── Measuring ─────────────────────────────────────────────────────────────────
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def rss_mb():
+    """Current resident set size in MB; the peak where that is not known."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def _counts(obj):
+    """Total (faces, edges) of every shape in ``obj`` (a shape or a sequence)."""
+    if hasattr(obj, "Faces") and hasattr(obj, "Edges"):
+        return len(obj.Faces), len(obj.Edges)
+    if isinstance(obj, (list, tuple)):
+        faces = edges = 0
+        for item in obj:
+            f, e = _counts(item)
+            faces, edges = faces + f, edges + e
+        return faces, edges
+    return 0, 0
+
+
+def _record(stage, seconds, inputs, output):
+    faces_in, edges_in = _counts(list(inputs))
+    faces_out, edges_out = _counts(output)
+    RECORDS.append({
+        "tile": "/".join(_context), "stage": stage, "seconds": seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "faces_in": faces_in, "edges_in": edges_in,
+        "faces_out": faces_out, "edges_out": edges_out,
+    })
+
+
+# ─── Hooks used by the builders ────────────────────────────────────────────────
+
+def timed(stage):
+    """
+    Decorator recording a call as ``stage``: the positional arguments are
+    its input shapes and the return value its output.  A no-op when
+    profiling is off.
+    """
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+
+        def timed_fn(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            _record(stage, time.perf_counter() - start, args, result)
+            return result
+        timed_fn.__name__ = fn.__name__
+        timed_fn.__doc__ = fn.__doc__
+        return timed_fn
+    return wrap
+
+
+@contextlib.contextmanager
+def _section(label, stage):
+    _context.append(label)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stage:
+            _record(stage, time.perf_counter() - start, (), None)
+        _context.pop()
+
+
+_NOTHING = contextlib.nullcontext()
+
+
+def section(label, stage=None):
+    """
+    Context manager labelling the stages recorded inside it with ``label``
+    (the tile name), and timing the whole block as ``stage`` if given.
+    """
+    return _section(label, stage) if ENABLED else _NOTHING
+
+
+# ─── Output ────────────────────────────────────────────────────────────────────
+
+def write(path, records=None):
+    """Write ``records`` (default: all so far) as CSV or JSON by extension."""
+    records = RECORDS if records is None else records
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w") as fh:
+            json.dump(records, fh, indent=2)
+
+
+def aggregate(records):
+    """
+    Per-stage totals over ``records``, e.g. a whole batch:
+    ``{stage: {"count", "seconds", "mean", "max", "peak_rss_mb"}}``.
+    """
+    stages = {}
+    for r in records:
+        s = stages.setdefault(r["stage"], {"count": 0, "seconds": 0.0, "max": 0.0,
+                                           "peak_rss_mb": 0.0})
+        s["count"] += 1
+        s["seconds"] += r["seconds"]
+        s["max"] = max(s["max"], r["seconds"])
+        s["peak_rss_mb"] = max(s["peak_rss_mb"], r["peak_rss_mb"] or 0.0)
+    for s in stages.values():
+        s["mean"] = s["seconds"] / s["count"]
+    return stages
+
+
+if ENABLED and _SETTING.lower().endswith((".json", ".csv")):
+    atexit.register(lambda: write(_SETTING))
@@ -0,0 +1,112 @@
+"""
+Shared plane geometry for the Girih tiles.
+
+Every tile is built from angles in the 18° family, and their sines and
+cosines all follow from the golden ratio, so they are computed once here
+instead of through ``math.cos(math.radians(...))`` at every use.  The
+module also holds the one polygon walk and the bar corner computation
+(``make_prism``'s geometry for many bars at once) that ``girih``,
+``strapwork``, ``tiling`` and ``validate`` share, and the tile outlines.
+It needs NumPy only, not FreeCAD.
+"""
+import math
+
+import numpy as np
+
+# ─── The 18° family ────────────────────────────────────────────────────────────
+PHI   = (1 + 5**0.5) / 2            # golden ratio
+
+COS36 = PHI / 2
+SIN18 = (PHI - 1) / 2
+SIN36 = math.sqrt(1 - COS36*COS36)
+COS18 = math.sqrt(1 - SIN18*SIN18)
+
+COS54, SIN54 = SIN36, COS36
+COS72, SIN72 = SIN18, COS18
+TAN18 = SIN18 / COS18
+TAN36 = SIN36 / COS36
+
+
+# ─── Polygons ──────────────────────────────────────────────────────────────────
+
+def walk(side, interior_angles, direction, center=True):
+    """
+    Walk the perimeter from (-side/2, 0), heading ``direction`` degrees,
+    turning inward by (180 - interior) at each corner.  Returns the corners
+    as an (N, 2) array, optionally re-centered on their mean.
+    """
+    turns = 180.0 - np.asarray(interior_angles[:-1], dtype=float)
+    headings = np.radians(direction - np.concatenate([[0.0], np.cumsum(turns)]))
+    steps = side * np.stack([np.cos(headings), np.sin(headings)], axis=1)
+    verts = np.array([-side/2, 0.0]) + np.concatenate([[[0.0, 0.0]], np.cumsum(steps, axis=0)[:-1]])
+    if center:
+        verts = verts - verts.mean(axis=0)
+    return verts
+
+
+def regular_polygon(n_sides, R, start_angle):
+    """(n, 2) corners of a regular polygon of circumradius R, the first at start_angle."""
+    t = start_angle + 2*np.pi*np.arange(n_sides)/n_sides
+    return R * np.stack([np.cos(t), np.sin(t)], axis=1)
+
+
+# ─── Tile outlines ─────────────────────────────────────────────────────────────
+TORANGE_ANGLES   = [72, 108] * 2       # rhombus angles [72°,108°]×2
+SHESHBAND_ANGLES = [72, 144, 144] * 2  # Shesh Band angles
+SORMEHDAN_ANGLES = [72, 72, 216] * 2   # bow-tie hexagon pattern
+
+
+def outline(name, side=1.0):
+    """
+    Corners of tile ``name`` with sides ``side`` as an (N, 2) array, in the
+    frame (and corner order) ``girih.LAYOUTS`` builds the tile in.
+    """
+    if name == "tabl":
+        return regular_polygon(10, side / (2*SIN18), math.pi/2 + math.pi/10)
+    if name == "pange":
+        # original flat‐top start: π/2 + π/5 ; add π to flip it
+        return regular_polygon(5, side / (2*SIN36), math.pi/2 + math.pi/5 + math.pi)
+    if name == "torange":
+        return walk(side, TORANGE_ANGLES, 144)
+    if name == "sheshband":
+        # The walk starts on the long axis; shift down so the filigree, laid
+        # out around the origin, sits in the middle of the tile
+        return walk(side, SHESHBAND_ANGLES, 144, center=False) - (0.0, side*SIN36)
+    if name == "sormehdan":
+        return walk(side, SORMEHDAN_ANGLES, 18)
+    raise KeyError("Unknown tile %r" % name)
+
+
+# ─── Bars ──────────────────────────────────────────────────────────────────────
+
+def bar_corners(bars, width, ang):
+    """
+    Corner coordinates of every bar in ``bars`` as an (N, 4, 2) array, in the
+    same order as ``girih.make_prism`` puts them (counterclockwise).  A bar
+    is ``(L, rot, base, half1, half2)``.
+    """
+    L, rot, base, half1, half2 = zip(*bars)
+    L     = np.asarray(L, dtype=float)
+    rot   = np.radians(np.asarray(rot, dtype=float))
+    base  = np.asarray(base, dtype=float)[:, :2]
+
+    # choose the “cut angle” on each end
+    β1 = np.radians(np.where(half1, ang*0.5, ang))
+    β2 = np.radians(np.where(half2, ang*0.5, ang))
+
+    hw = width/2
+    C1 = (L/2)*np.cos(β1)
+    C2 = (L/2)*np.cos(β2)
+
+    # corner X’s for y = ±hw
+    x1 = ( C2 + hw*np.sin(β2)) / np.cos(β2)
+    x2 = ( C2 - hw*np.sin(β2)) / np.cos(β2)
+    x3 = (-C1 + hw*np.sin(β1)) / np.cos(β1)
+    x4 = (-C1 - hw*np.sin(β1)) / np.cos(β1)
+
+    xs = np.stack([x1, x2, x3, x4], axis=1)
+    ys = np.broadcast_to(np.array([-hw, hw, hw, -hw]), xs.shape)
+
+    c, s = np.cos(rot)[:, None], np.sin(rot)[:, None]
+    return np.stack([c*xs - s*ys + base[:, 0:1],
+                     s*xs + c*ys + base[:, 1:2]], axis=2)
@@ -0,0 +1,116 @@
+"""
+Level-of-detail display of assembled tiles in the FreeCAD 3D view.
+
+Hundreds of full tile solids make the view crawl.  ``show`` draws a layout
+straight into the scene graph instead: each tile type gets one node, a
+``SoLevelOfDetail`` choosing between the solid tile and filigree and a flat
+top view (the tile outline minus the straps in ``TILE_COLOR``, the straps
+in ``LINE_COLOR``), and every placed tile is only a transform in front of
+that shared node.  A tile is drawn solid when it covers more than
+``NEAR_PIXELS`` squared on screen, so zooming in on a few tiles shows them
+in full while a whole panel stays a few thousand flat polygons.
+
+    import lod
+    root = lod.show(patch.read_layout("panel.csv"), params)
+    ...
+    lod.hide(root)
+
+Both levels come from the tile's 2D profiles (``girih.profiles``) meshed by
+``meshwriter``, so no OCC tessellation is involved.  The nodes are not
+document objects and are not saved; ``patch.assemble(..., lod=True)`` adds
+them in place of showing the link arrays.
+"""
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import girih
+import meshwriter
+
+NEAR_PIXELS = 150               # drawn solid once wider than this on screen
+
+
+# ─── Nodes ─────────────────────────────────────────────────────────────────────
+
+def _mesh(triangles, color, solid=True):
+    """A separator drawing ``triangles`` in ``color`` (decimal rgb)."""
+    from pivy import coin
+    points, index = {}, []
+    for tri in triangles:
+        index += [points.setdefault(pt, len(points)) for pt in tri] + [-1]
+
+    sep = coin.SoSeparator()
+    hints = coin.SoShapeHints()
+    hints.vertexOrdering = coin.SoShapeHints.COUNTERCLOCKWISE
+    hints.shapeType = (coin.SoShapeHints.SOLID if solid
+                       else coin.SoShapeHints.UNKNOWN_SHAPE_TYPE)
+    material = coin.SoMaterial()
+    material.diffuseColor.setValue(*girih.rgb(color))
+    coords = coin.SoCoordinate3()
+    coords.point.setValues(0, len(points), list(points))
+    faces = coin.SoIndexedFaceSet()
+    faces.coordIndex.setValues(0, len(index), index)
+    for node in (hints, material, coords, faces):
+        sep.addChild(node)
+    return sep
+
+
+def type_node(name, params=None, near=NEAR_PIXELS):
+    """The shared level-of-detail node of tile ``name``: solid near, flat far."""
+    from pivy import coin
+    p, prof = girih.profiles(name, params)
+    _, S, R = meshwriter.conform([(prof["outline"], [])], prof["straps"], prof["ring"])
+
+    solid = coin.SoSeparator()
+    solid.addChild(_mesh(meshwriter.tile_triangles(p, prof), p["TILE_COLOR"]))
+    solid.addChild(_mesh(meshwriter.filigree_triangles(p, prof), p["LINE_COLOR"]))
+
+    flat = coin.SoSeparator()
+    flat.addChild(_mesh(meshwriter.cap(R, p["THICK"] - p["RECESS"]), p["TILE_COLOR"], False))
+    flat.addChild(_mesh(meshwriter.cap(S, p["THICK"]), p["LINE_COLOR"], False))
+
+    node = coin.SoLevelOfDetail()
+    node.screenArea.setValue(float(near * near))
+    node.addChild(solid)
+    node.addChild(flat)
+    return node
+
+
+# ─── Layouts ───────────────────────────────────────────────────────────────────
+
+def layout_node(layout, params=None, near=NEAR_PIXELS):
+    """A separator with every tile of ``layout`` as a transform on its type's node."""
+    from pivy import coin
+    p = girih.with_defaults(params)             # one set for all types, as patch.prototypes
+    shared = {}
+    root = coin.SoSeparator()
+    root.setName("GirihLOD")
+    for name, x, y, rotation in layout:
+        if name not in shared:
+            shared[name] = type_node(name, p, near)
+        placed = coin.SoSeparator()
+        move = coin.SoTransform()
+        move.translation.setValue(x, y, 0)
+        move.rotation.setValue(coin.SbVec3f(0, 0, 1), math.radians(rotation))
+        placed.addChild(move)
+        placed.addChild(shared[name])
+        root.addChild(placed)
+    return root
+
+
+def _view(view):
+    import FreeCADGui as Gui
+    return view or Gui.ActiveDocument.ActiveView
+
+
+def show(layout, params=None, view=None, near=NEAR_PIXELS):
+    """Add ``layout`` to the scene graph of ``view`` (default: the active one)."""
+    root = layout_node(layout, params, near)
+    _view(view).getSceneGraph().addChild(root)
+    return root
+
+
+def hide(root, view=None):
+    """Take a node added by ``show`` out of the scene graph again."""
+    _view(view).getSceneGraph().removeChild(root)
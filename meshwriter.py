@@ -0,0 +1,541 @@
+"""
+Direct mesh export for the extruded tile geometry.
+
+Every part of a tile is a stack of planar profiles extruded along Z, so it
+can be meshed exactly from the 2D outlines: triangulate the caps, add a quad
+per outline edge for the walls, and stream the triangles to a binary STL or
+a 3MF file.  OCC never tessellates anything.  Panels go to 3MF with each
+tile type meshed once and the tiles as transformed build items
+(``export_panel``).
+
+The mesher itself is pure Python.  ``export_tile`` gets the profiles from
+``girih.profiles``, which needs FreeCAD only for the 2D strap union.
+
+A polygon is ``(outer, [holes...])`` with each ring a list of (x, y)
+points; a region is a list of polygons.  A triangle is three (x, y, z)
+points in counterclockwise order seen from outside the solid.
+"""
+import math
+import os
+import struct
+import zipfile
+
+PARTS = ("BaseTile", "Filigree", "MoldWithCavity")
+
+# Coordinates are snapped to this grid (mm) so that points shared by
+# different profiles compare equal.
+SNAP = 1e-6
+
+# Triangles packed per write when streaming STL.
+STL_BUFFER_TRIANGLES = 4096
+
+
+# ─── Rings ─────────────────────────────────────────────────────────────────────
+
+def signed_area(ring):
+    """Twice the signed area of ``ring``; positive when counterclockwise."""
+    return sum(x0*y1 - x1*y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]))
+
+
+def _clean(ring, ccw):
+    """Snap ``ring`` to the grid, drop repeated points and orient it."""
+    out = []
+    for x, y in ring:
+        pt = (round(x / SNAP) * SNAP, round(y / SNAP) * SNAP)
+        if not out or pt != out[-1]:
+            out.append(pt)
+    if len(out) > 1 and out[0] == out[-1]:
+        out.pop()
+    if (signed_area(out) > 0) != ccw:
+        out.reverse()
+    return out
+
+
+def _split(ring, points):
+    """Insert every point of ``points`` that lies inside an edge of ``ring``."""
+    out = []
+    for a, b in zip(ring, ring[1:] + ring[:1]):
+        out.append(a)
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        length2 = dx*dx + dy*dy
+        lo_x, hi_x = min(a[0], b[0]) - SNAP, max(a[0], b[0]) + SNAP
+        lo_y, hi_y = min(a[1], b[1]) - SNAP, max(a[1], b[1]) + SNAP
+        on_edge = []
+        for pt in points:
+            if not (lo_x <= pt[0] <= hi_x and lo_y <= pt[1] <= hi_y):
+                continue
+            if pt == a or pt == b:
+                continue
+            cross = dx*(pt[1] - a[1]) - dy*(pt[0] - a[0])
+            if cross*cross > 4*SNAP*SNAP*length2:
+                continue
+            t = (dx*(pt[0] - a[0]) + dy*(pt[1] - a[1])) / length2
+            if 0 < t < 1:
+                on_edge.append((t, pt))
+        out.extend(pt for _, pt in sorted(on_edge))
+    return out
+
+
+def _inside(pt, ring):
+    """Even-odd test of ``pt`` against ``ring``."""
+    x, y = pt
+    inside = False
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0)*(x1 - x0)/(y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _rechain(region):
+    """
+    Rebuild the rings of ``region`` from its boundary edges, dropping every
+    edge that is also walked the other way.  A strap lying along the tile
+    outline leaves a zero-width sliver between a hole and its outer ring;
+    once snapped, those edges cancel and the ring splits into the pieces
+    it really encloses.  Pinch points are resolved by always taking the
+    sharpest right turn, so every ring comes out simple.
+    """
+    edges = {}
+    for outer, holes in region:
+        for ring in [outer] + holes:
+            for a, b in zip(ring, ring[1:] + ring[:1]):
+                if edges.get((b, a)):
+                    edges[(b, a)] -= 1
+                else:
+                    edges[(a, b)] = edges.get((a, b), 0) + 1
+    out = {}
+    for (a, b), n in edges.items():
+        out.setdefault(a, []).extend([b] * n)
+
+    def turn(u, v, w):
+        # Clockwise angle from v→u round to v→w, in (0, 2π]
+        back = math.atan2(u[1] - v[1], u[0] - v[0])
+        ahead = math.atan2(w[1] - v[1], w[0] - v[0])
+        return (back - ahead) % (2*math.pi) or 2*math.pi
+
+    rings = []
+    for start in list(out):
+        while out.get(start):
+            ring, u, v = [start], start, out[start].pop()
+            while v != start:
+                ring.append(v)
+                w = min(out[v], key=lambda w: turn(u, v, w))
+                out[v].remove(w)
+                u, v = v, w
+            rings.append(ring)
+
+    outers = [r for r in rings if signed_area(r) > 0]
+    polygons = [(r, []) for r in outers]
+    for r in rings:
+        if signed_area(r) >= 0:
+            continue
+        # A point just inside the region, to the left of the hole's first edge
+        (x0, y0), (x1, y1) = r[0], r[1]
+        probe = ((x0 + x1)/2 - (y1 - y0)*1e-3, (y0 + y1)/2 + (x1 - x0)*1e-3)
+        owners = [i for i, o in enumerate(outers) if _inside(probe, o)]
+        if owners:
+            i = min(owners, key=lambda i: signed_area(outers[i]))
+            polygons[i][1].append(r)
+    return polygons
+
+
+def conform(*regions):
+    """
+    Orient every ring (outers counterclockwise, holes clockwise) and split
+    edges wherever another ring's vertex lies on them, so that all walls and
+    caps built from ``regions`` share edges exactly and the mesh is closed.
+    """
+    cleaned = [[(_clean(outer, True), [_clean(h, False) for h in holes])
+                for outer, holes in region] for region in regions]
+    points = {pt for region in cleaned for outer, holes in region
+              for ring in [outer] + holes for pt in ring}
+    return [_rechain([(_split(outer, points), [_split(h, points) for h in holes])
+                      for outer, holes in region]) for region in cleaned]
+
+
+# ─── Triangulation ─────────────────────────────────────────────────────────────
+
+def _cross(o, a, b):
+    return (a[0] - o[0])*(b[1] - o[1]) - (a[1] - o[1])*(b[0] - o[0])
+
+
+def _in_triangle(pt, a, b, c):
+    """True if ``pt`` is inside or on the counterclockwise triangle abc."""
+    eps = -SNAP*SNAP
+    return _cross(a, b, pt) >= eps and _cross(b, c, pt) >= eps and _cross(c, a, pt) >= eps
+
+
+def _bridge(outer, hole):
+    """Join ``hole`` into ``outer`` with a zero-width cut from its rightmost vertex."""
+    n = len(outer)
+    m = max(range(len(hole)), key=lambda i: hole[i])
+    mx, my = hole[m]
+
+    # Nearest edge of outer hit by a ray from the hole towards +x
+    best, best_x = None, None
+    for i in range(n):
+        a, b = outer[i], outer[(i + 1) % n]
+        if a[1] == b[1] or not min(a[1], b[1]) <= my <= max(a[1], b[1]):
+            continue
+        x = a[0] + (my - a[1])*(b[0] - a[0])/(b[1] - a[1])
+        if x < mx or (best_x is not None and x >= best_x):
+            continue
+        best_x = x
+        if (x, my) == a:
+            best = i
+        elif (x, my) == b:
+            best = (i + 1) % n
+        else:
+            best = i if a[0] > b[0] else (i + 1) % n
+
+    # A reflex vertex inside the triangle (hole point, hit, candidate) would
+    # block the cut; take the one closest in angle to the ray instead.
+    cand = outer[best]
+    if cand != (best_x, my):
+        tri = [(mx, my), (best_x, my), cand]
+        if _cross(*tri) < 0:
+            tri.reverse()
+        best_slope = None
+        for i, pt in enumerate(outer):
+            if pt == cand or _cross(outer[i - 1], pt, outer[(i + 1) % n]) > 0:
+                continue
+            if pt[0] > mx and _in_triangle(pt, *tri):
+                slope = abs(pt[1] - my)/(pt[0] - mx)
+                if best_slope is None or slope < best_slope:
+                    best, best_slope = i, slope
+
+    return outer[:best + 1] + hole[m:] + hole[:m + 1] + outer[best:]
+
+
+def triangulate(outer, holes=()):
+    """
+    Ear-clip a counterclockwise ``outer`` ring with clockwise ``holes`` into
+    counterclockwise 2D triangles.  Vertices are never moved or dropped, so
+    the caps share every boundary edge with the walls.
+    """
+    poly = list(outer)
+    for hole in sorted(holes, key=max, reverse=True):
+        poly = _bridge(poly, hole)
+
+    triangles = []
+    start = 0
+    while len(poly) > 3:
+        n = len(poly)
+        turns = [_cross(poly[i - 1], poly[i], poly[(i + 1) % n]) for i in range(n)]
+        # Only reflex (or straight) corners can sit inside a candidate ear
+        reflex = [poly[i] for i in range(n) if turns[i] <= SNAP*SNAP]
+
+        ear = None
+        for k in range(n):
+            i = (start + k) % n
+            if turns[i] <= SNAP*SNAP:
+                continue
+            a, b, c = poly[i - 1], poly[i], poly[(i + 1) % n]
+            if any(_in_triangle(pt, a, b, c) for pt in reflex
+                   if pt != a and pt != b and pt != c):
+                continue
+            ear = i
+            break
+        if ear is None:
+            # Only degenerate corners are left; clip the least bad one.
+            ear = max(range(n), key=turns.__getitem__)
+
+        triangles.append((poly[ear - 1], poly[ear], poly[(ear + 1) % n]))
+        del poly[ear]
+        start = max(ear - 1, 0)
+    triangles.append(tuple(poly))
+    return triangles
+
+
+# ─── Extruded parts ────────────────────────────────────────────────────────────
+
+def cap(region, z, up=True):
+    """Triangles covering ``region`` at height ``z``, facing up or down."""
+    tris = []
+    for outer, holes in region:
+        for a, b, c in triangulate(outer, holes):
+            if up:
+                tris.append(((a[0], a[1], z), (b[0], b[1], z), (c[0], c[1], z)))
+            else:
+                tris.append(((a[0], a[1], z), (c[0], c[1], z), (b[0], b[1], z)))
+    return tris
+
+
+def walls(region, z0, z1):
+    """The vertical walls of ``region`` between ``z0`` and ``z1``, facing out."""
+    tris = []
+    for outer, holes in region:
+        for ring in [outer] + holes:
+            for a, b in zip(ring, ring[1:] + ring[:1]):
+                a0, b0 = (a[0], a[1], z0), (b[0], b[1], z0)
+                a1, b1 = (a[0], a[1], z1), (b[0], b[1], z1)
+                tris.append((a0, b0, b1))
+                tris.append((a0, b1, a1))
+    return tris
+
+
+def tile_triangles(p, prof):
+    """The base tile: a slab up to the groove floor with "outline minus straps" on top."""
+    top = p["THICK"] - p["RECESS"]
+    floor = top - p["EMBEDDING"]
+    T, S, R = conform([(prof["outline"], [])], prof["straps"], prof["ring"])
+
+    if p["EMBEDDING"] <= 0:
+        return cap(T, 0, up=False) + walls(T, 0, top) + cap(T, top)
+    return (cap(T, 0, up=False) + walls(T, 0, floor) + cap(S, floor)
+            + walls(R, floor, top) + cap(R, top))
+
+
+def filigree_triangles(p, prof):
+    """The filigree: the strap outline from the groove floor to THICK."""
+    floor = p["THICK"] - p["RECESS"] - p["EMBEDDING"]
+    S, = conform(prof["straps"])
+    return cap(S, floor, up=False) + walls(S, floor, p["THICK"]) + cap(S, p["THICK"])
+
+
+def mold_triangles(p, prof):
+    """
+    The mold body minus the tile and filigree, flipped about X for printing
+    like ``girih.finish_mold`` does.  The cavity is the tile outline up to
+    the tile top and the strap outline from there to THICK.
+    """
+    top = p["THICK"] - p["RECESS"]
+    height = p["THICK"] + p["MOLD_BUFFER"]
+    O, T, S, R = conform([(prof["mold"], [])], [(prof["outline"], [])],
+                         prof["straps"], prof["ring"])
+    outer = O[0][0]
+    # The tile and strap outlines become holes (clockwise), and the holes in
+    # the straps become islands of mold (counterclockwise).
+    around_tile = [(outer, [T[0][0][::-1]])]
+    around_straps = ([(outer, [s[::-1] for s, _ in S])]
+                     + [(h[::-1], []) for _, holes in S for h in holes])
+
+    tris = (cap(around_tile, 0, up=False) + walls(around_tile, 0, top)
+            + cap(R, top, up=False) + walls(around_straps, top, p["THICK"])
+            + cap(S, p["THICK"], up=False) + walls(O, p["THICK"], height)
+            + cap(O, height))
+    # Rotate 180° about X: (x, y, z) → (x, -y, -z)
+    return [tuple((x, -y, -z) for x, y, z in tri) for tri in tris]
+
+
+def tile_meshes(name, params=None, parts=PARTS):
+    """``{part name: triangles}`` for the ``parts`` of tile ``name``."""
+    import girih  # needs FreeCAD for the 2D strap union
+    p, prof = girih.profiles(name, params)
+    meshers = {
+        "BaseTile":       tile_triangles,
+        "Filigree":       filigree_triangles,
+        "MoldWithCavity": mold_triangles,
+    }
+    return {part: meshers[part](p, prof) for part in parts}
+
+
+# ─── STL ───────────────────────────────────────────────────────────────────────
+
+def _normal(a, b, c):
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    nx, ny, nz = uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx
+    length = (nx*nx + ny*ny + nz*nz) ** 0.5 or 1.0
+    return nx/length, ny/length, nz/length
+
+
+def write_stl(path, triangles, name="girih"):
+    """
+    Stream ``triangles`` to a binary STL file through a fixed-size buffer.
+    The triangle count in the header is patched in at the end.
+    """
+    record = struct.Struct("<12fH")
+    buf = bytearray(record.size * STL_BUFFER_TRIANGLES)
+    count = used = 0
+    with open(path, "wb") as fh:
+        fh.write(name.encode("ascii", "replace")[:80].ljust(80, b"\0"))
+        fh.write(struct.pack("<I", 0))
+        for a, b, c in triangles:
+            record.pack_into(buf, used, *_normal(a, b, c), *a, *b, *c, 0)
+            used += record.size
+            count += 1
+            if used == len(buf):
+                fh.write(buf)
+                used = 0
+        fh.write(memoryview(buf)[:used])
+        fh.seek(80)
+        fh.write(struct.pack("<I", count))
+    return count
+
+
+# ─── 3MF ───────────────────────────────────────────────────────────────────────
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+ <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+ <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>
+</Types>
+"""
+
+RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+ <Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>
+</Relationships>
+"""
+
+MODEL_NS = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+
+
+def _indexed(triangles):
+    """Weld shared corners: ``(vertices, [(i, j, k), ...])``."""
+    index, vertices, faces = {}, [], []
+    for tri in triangles:
+        ids = []
+        for v in tri:
+            i = index.get(v)
+            if i is None:
+                i = index[v] = len(vertices)
+                vertices.append(v)
+            ids.append(i)
+        faces.append(ids)
+    return vertices, faces
+
+
+def _write_lines(fh, lines, chunk=STL_BUFFER_TRIANGLES):
+    """Write an iterable of text lines through a fixed-size batch."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == chunk:
+            fh.write("".join(batch).encode("utf-8"))
+            batch.clear()
+    fh.write("".join(batch).encode("utf-8"))
+
+
+def _write_object(fh, oid, name, triangles, material=None):
+    """One mesh ``<object>``; ``material`` is ``(basematerials id, index)``."""
+    vertices, faces = _indexed(triangles)
+    props = ' pid="%d" pindex="%d"' % material if material else ""
+    fh.write(('  <object id="%d" name="%s" type="model"%s>\n'
+              '   <mesh>\n    <vertices>\n' % (oid, name, props)).encode("utf-8"))
+    _write_lines(fh, ('     <vertex x="%.6f" y="%.6f" z="%.6f"/>\n' % v
+                      for v in vertices))
+    fh.write(b'    </vertices>\n    <triangles>\n')
+    _write_lines(fh, ('     <triangle v1="%d" v2="%d" v3="%d"/>\n' % tuple(f)
+                      for f in faces))
+    fh.write(b'    </triangles>\n   </mesh>\n  </object>\n')
+
+
+def _open_model(zf):
+    zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+    zf.writestr("_rels/.rels", RELS)
+    fh = zf.open("3D/3dmodel.model", "w")
+    fh.write(('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<model unit="millimeter" xml:lang="en-US" xmlns="%s">\n'
+              ' <resources>\n' % MODEL_NS).encode("utf-8"))
+    return fh
+
+
+def write_3mf(path, objects):
+    """
+    Write ``objects``, a mapping or sequence of ``(name, triangles)``, to one
+    3MF file with a build item per object.  Units are millimeters.
+    """
+    if hasattr(objects, "items"):
+        objects = list(objects.items())
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        with _open_model(zf) as fh:
+            for oid, (name, triangles) in enumerate(objects, 1):
+                _write_object(fh, oid, name, triangles)
+            fh.write(b' </resources>\n <build>\n')
+            for oid in range(1, len(objects) + 1):
+                fh.write((' <item objectid="%d"/>\n' % oid).encode("utf-8"))
+            fh.write(b' </build>\n</model>\n')
+
+
+def _transform(x, y, rotation):
+    """3MF ``transform`` attribute for a turn about Z then a move in XY."""
+    c = round(math.cos(math.radians(rotation)), 12) + 0.0     # no "-0" or 6e-17
+    s = round(math.sin(math.radians(rotation)), 12) + 0.0
+    return "%.9g %.9g 0 %.9g %.9g 0 0 0 1 %.6f %.6f 0" % (c, s, -s + 0.0, c, x, y)
+
+
+def write_instanced_3mf(path, meshes, placed, colors=None):
+    """
+    Write a panel as one mesh resource per tile type and part, and one build
+    item per placed tile referencing its type by transform, so the file
+    grows by a line per tile rather than a mesh per tile.
+
+    ``meshes`` is ``{tile: {part: triangles}}``, ``placed`` is ``{tile:
+    [(x, y, rotation), ...]}`` (mm and degrees, as ``patch.by_type``
+    gives) and ``colors`` is ``{part: (r, g, b)}`` in decimal, written as
+    3MF base materials.
+    """
+    colors = colors or {}
+    materials = [part for part in PARTS if part in colors]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        with _open_model(zf) as fh:
+            if materials:
+                fh.write(b'  <basematerials id="1">\n')
+                for part in materials:
+                    fh.write(('   <base name="%s" displaycolor="#%02X%02X%02X"/>\n'
+                              % ((part,) + tuple(colors[part]))).encode("utf-8"))
+                fh.write(b'  </basematerials>\n')
+            oid = 1
+            assembly = {}
+            for name, parts in meshes.items():
+                ids = []
+                for part, triangles in parts.items():
+                    oid += 1
+                    material = (1, materials.index(part)) if part in materials else None
+                    _write_object(fh, oid, "%s %s" % (name, part), triangles, material)
+                    ids.append(oid)
+                oid += 1
+                fh.write(('  <object id="%d" name="%s" type="model">\n   <components>\n'
+                          % (oid, name)).encode("utf-8"))
+                for i in ids:
+                    fh.write(('    <component objectid="%d"/>\n' % i).encode("utf-8"))
+                fh.write(b'   </components>\n  </object>\n')
+                assembly[name] = oid
+            fh.write(b' </resources>\n <build>\n')
+            for name, spots in placed.items():
+                _write_lines(fh, (' <item objectid="%d" transform="%s"/>\n'
+                                  % (assembly[name], _transform(*spot)) for spot in spots))
+            fh.write(b' </build>\n</model>\n')
+
+
+# ─── Export ────────────────────────────────────────────────────────────────────
+
+def export_tile(name, params=None, directory=".", fmt="stl", parts=PARTS):
+    """
+    Mesh tile ``name`` and write it to ``directory``: one ``<part>.stl`` per
+    part, or a single ``<name>.3mf`` holding all of them.  Returns the paths.
+    """
+    meshes = tile_meshes(name, params, parts)
+    os.makedirs(directory, exist_ok=True)
+    if fmt == "3mf":
+        path = os.path.join(directory, name + ".3mf")
+        write_3mf(path, [(part, meshes[part]) for part in parts])
+        return [path]
+    if fmt != "stl":
+        raise ValueError("Unknown mesh format %r, expected 'stl' or '3mf'" % fmt)
+    paths = []
+    for part in parts:
+        path = os.path.join(directory, part + ".stl")
+        write_stl(path, meshes[part], name="%s %s" % (name, part))
+        paths.append(path)
+    return paths
+
+
+def export_panel(path, layout, params=None, parts=("BaseTile", "Filigree")):
+    """
+    Write a panel layout (``[(tile, x, y, rotation), ...]``, see
+    ``patch.read_layout``) to an instanced 3MF file: each tile type is
+    meshed once and every tile placed by transform.  Colors come from
+    ``TILE_COLOR`` and ``LINE_COLOR``.  Returns the path.
+    """
+    import girih
+    import patch
+    p = girih.with_defaults(params)
+    placed = patch.by_type(layout)
+    meshes = {name: tile_meshes(name, p, parts) for name in placed}
+    colors = {"BaseTile": p["TILE_COLOR"], "Filigree": p["LINE_COLOR"],
+              "MoldWithCavity": (128, 128, 128)}
+    write_instanced_3mf(path, meshes, placed, colors)
+    return path
@@ -0,0 +1,245 @@
+"""
+Print-bed nesting: pack tiles (or molds) onto fixed-size build plates.
+
+Each part is dropped onto a skyline of the plate "tetris" style: for every
+allowed rotation its outline is sampled into a bottom and a top profile
+per column, the profile is dropped at every column position at once
+(NumPy), and the placement with the lowest top wins, leftmost on ties.
+Parts go biggest first; when one no longer fits, a new plate is started.
+Rotations are multiples of 36°, so a part's sides keep the directions the
+tile was designed with.
+
+    import nest
+    plates = nest.nest({"pange": 12, "torange": 20}, nest.outlines(["pange", "torange"]),
+                       bed=(256, 256), gap=3)
+    nest.write_plates("plates", plates)
+
+A plate is a layout of ``(tile, x, y, rotation)`` entries, the same as
+``patch.read_layout`` gives, so it can go straight to ``patch.assemble``
+or ``meshwriter.export_panel``.  Hundreds of parts nest in well under a
+second; only ``outlines`` needs FreeCAD.
+"""
+import argparse
+import csv
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BED = (256.0, 256.0)            # mm
+GAP = 3.0                       # min. distance between parts, mm
+RESOLUTION = 0.5                # column width of the skyline, mm
+SUBSAMPLES = 4                  # outline samples per column
+ROTATIONS = tuple(range(0, 360, 36))
+
+
+# ─── Outlines ──────────────────────────────────────────────────────────────────
+
+def outlines(names, params=None, part="tile"):
+    """
+    ``{tile: [(x, y), ...]}`` of the tile outlines, or with ``part="mold"``
+    the mold outlines as printed (flipped about X like the mold itself).
+    """
+    import girih
+    found = {}
+    for name in names:
+        p = girih.tile_params(name, params)
+        verts, _, mold_verts = girih.LAYOUTS[name](p)
+        if part == "tile":
+            found[name] = [(v.x, v.y) for v in verts]
+        elif name in girih.ROUND_MOLDS:
+            r = mold_verts[0].Length
+            found[name] = [(r * math.cos(2*math.pi*i/girih.MOLD_SEGMENTS),
+                            r * math.sin(2*math.pi*i/girih.MOLD_SEGMENTS))
+                           for i in range(girih.MOLD_SEGMENTS)]
+        else:
+            found[name] = [(v.x, -v.y) for v in mold_verts]
+    return found
+
+
+def _rotated(outline, rotation):
+    c, s = math.cos(math.radians(rotation)), math.sin(math.radians(rotation))
+    return np.array([(x*c - y*s, x*s + y*c) for x, y in outline])
+
+
+def profiles(outline, rotation, gap=GAP, resolution=RESOLUTION):
+    """
+    The outline turned by ``rotation`` as column profiles, a dict with
+
+        x0, y0     the lower left corner of the turned outline
+        columns    the columns it spans, ``resolution`` wide
+        height     its height
+        bottom     per column, its lowest point above y0
+        top        per column, its highest point above y0 grown by ``gap``
+
+    ``bottom`` and ``top`` have ``gap / resolution`` extra columns on each
+    side, so parts dropped onto the top keep their distance sideways too.
+    """
+    pts = _rotated(outline, rotation)
+    x0, y0 = pts[:, 0].min(), pts[:, 1].min()
+    pts = pts - (x0, y0)
+    width = pts[:, 0].max()
+    columns = max(1, int(math.ceil(width / resolution)))
+
+    # Where every edge crosses every sample line, then min/max per column
+    xs = np.minimum(np.arange(columns * SUBSAMPLES + 1) * (resolution / SUBSAMPLES), width)
+    a, b = pts, np.roll(pts, -1, axis=0)
+    lo, hi = np.minimum(a[:, 0], b[:, 0]), np.maximum(a[:, 0], b[:, 0])
+    dx = np.where(hi > lo, b[:, 0] - a[:, 0], 1.0)
+    y = a[:, 1] + (xs[:, None] - a[:, 0]) / dx * (b[:, 1] - a[:, 1])
+    crosses = (xs[:, None] >= lo) & (xs[:, None] <= hi)
+    bottom = np.where(crosses, y, np.inf).min(axis=1)
+    top = np.where(crosses, y, -np.inf).max(axis=1)
+    # A column is covered by its two boundary samples, those in between and
+    # the corners falling inside it
+    window = np.arange(SUBSAMPLES + 1) + SUBSAMPLES * np.arange(columns)[:, None]
+    bottom = bottom[window].min(axis=1)
+    top = top[window].max(axis=1)
+    inside = np.minimum((pts[:, 0] / resolution).astype(int), columns - 1)
+    np.minimum.at(bottom, inside, pts[:, 1])
+    np.maximum.at(top, inside, pts[:, 1])
+
+    # Grow the top by a disc of radius gap
+    reach = int(math.ceil(gap / resolution))
+    top = np.concatenate([np.full(reach, -np.inf), top, np.full(reach, -np.inf)])
+    grown = top + gap
+    for k in range(1, reach + 1):
+        lift = math.sqrt(max(gap*gap - ((k - 1) * resolution) ** 2, 0.0))
+        grown[:-k] = np.maximum(grown[:-k], top[k:] + lift)
+        grown[k:] = np.maximum(grown[k:], top[:-k] + lift)
+    bottom = np.concatenate([np.full(reach, np.inf), bottom, np.full(reach, np.inf)])
+    return {"x0": x0, "y0": y0, "columns": columns, "height": pts[:, 1].max(),
+            "bottom": bottom, "top": grown}
+
+
+def shapes(outlines, gap=GAP, rotations=ROTATIONS, resolution=RESOLUTION):
+    """
+    ``{tile: [(rotation, profiles), ...]}`` with rotations that give the
+    same profiles (the tile's own symmetries) listed once.
+    """
+    found = {}
+    for name, outline in outlines.items():
+        distinct = []
+        for rotation in rotations:
+            prof = profiles(outline, rotation, gap, resolution)
+            if not any(np.array_equal(np.round(prof["top"], 6), np.round(q["top"], 6))
+                       and np.array_equal(np.round(prof["bottom"], 6), np.round(q["bottom"], 6))
+                       for _, q in distinct):
+                distinct.append((rotation, prof))
+        found[name] = distinct
+    return found
+
+
+# ─── Packing ───────────────────────────────────────────────────────────────────
+
+def _drop(skyline, prof, bed_columns, bed_height):
+    """Lowest ``(top, column, y)`` for ``prof`` on ``skyline``, or None."""
+    free = bed_columns - prof["columns"]
+    if free < 0:
+        return None
+    size = len(prof["bottom"])
+    windows = np.lib.stride_tricks.sliding_window_view(skyline, size)[:free + 1]
+    y = np.maximum((windows - prof["bottom"]).max(axis=1), 0.0)
+    tops = y + prof["height"]
+    i = int(np.argmin(tops))
+    if tops[i] > bed_height:
+        return None
+    return tops[i], i, y[i]
+
+
+def nest(counts, outlines, bed=BED, gap=GAP, rotations=ROTATIONS, resolution=RESOLUTION):
+    """
+    Pack ``counts`` (``{tile: quantity}``) of the ``outlines`` onto plates
+    of ``bed`` (width, height) mm, at least ``gap`` mm apart.  Returns a
+    list of plates, each a layout of ``(tile, x, y, rotation)`` entries
+    placing the tile's own origin.
+    """
+    variants = shapes({name: outlines[name] for name in counts}, gap, rotations, resolution)
+    area = {name: abs(polygon_area(outlines[name])) for name in counts}
+    queue = [name for name in sorted(counts, key=lambda n: -area[n]) for _ in range(counts[name])]
+
+    width, height = bed
+    bed_columns = int(width // resolution)
+    reach = int(math.ceil(gap / resolution))
+    plates = []
+    while queue:
+        skyline = np.zeros(bed_columns + 2 * reach)
+        plate, left = [], []
+        failed = set()
+        for name in queue:
+            if name in failed:
+                left.append(name)
+                continue
+            best = None
+            for rotation, prof in variants[name]:
+                found = _drop(skyline, prof, bed_columns, height)
+                if found and (best is None or found[:2] < best[0][:2]):
+                    best = (found, rotation, prof)
+            if best is None:
+                left.append(name)     # the skyline only rises, so skip its twins
+                failed.add(name)
+                continue
+            (_, i, y), rotation, prof = best
+            span = slice(i, i + len(prof["top"]))
+            skyline[span] = np.maximum(skyline[span], y + prof["top"])
+            plate.append((name, float(i * resolution - prof["x0"]), float(y - prof["y0"]),
+                          float(rotation)))
+        if not plate:
+            raise ValueError("%s does not fit on a %g x %g bed" % (left[0], width, height))
+        plates.append(plate)
+        queue = left
+    return plates
+
+
+def polygon_area(ring):
+    """Signed area of a ring of (x, y) points, positive counterclockwise."""
+    return 0.5 * sum(x0*y1 - x1*y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]))
+
+
+# ─── Output ────────────────────────────────────────────────────────────────────
+
+def write_plates(directory, plates):
+    """Write each plate as ``plate_<n>.csv`` (see ``patch.read_layout``)."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for n, plate in enumerate(plates, 1):
+        path = os.path.join(directory, "plate_%d.csv" % n)
+        with open(path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(("tile", "x", "y", "rotation"))
+            writer.writerows((name, "%.4f" % x, "%.4f" % y, "%g" % rot)
+                             for name, x, y, rot in plate)
+        paths.append(path)
+    return paths
+
+
+def parse_counts(text):
+    """``{tile: quantity}`` from ``"tabl=2,pange=10"``."""
+    counts = {}
+    for item in text.split(","):
+        name, _, n = item.partition("=")
+        counts[name] = int(n or 1)
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Nest Girih tiles or molds onto print beds.")
+    ap.add_argument("counts", type=parse_counts, help="quantities, e.g. tabl=2,pange=10")
+    ap.add_argument("--part", choices=("tile", "mold"), default="tile")
+    ap.add_argument("--bed", default="%gx%g" % BED, help="bed size WxH in mm")
+    ap.add_argument("--gap", type=float, default=GAP, help="min. gap between parts in mm")
+    ap.add_argument("-o", "--out", default="plates", help="directory for plate_<n>.csv")
+    args = ap.parse_args(argv)
+
+    bed = tuple(float(v) for v in args.bed.lower().split("x"))
+    plates = nest(args.counts, outlines(args.counts, part=args.part), bed, args.gap)
+    for path, plate in zip(write_plates(args.out, plates), plates):
+        sys.stderr.write("%s: %d part(s)\n" % (path, len(plate)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Parametric Girih tiles: document objects that rebuild when edited.
+
+``make_tile`` adds a tile to a document as a ``GirihTile`` object holding
+the parameters as properties, plus one ``Part::FeaturePython`` object per
+part (BaseTile, Filigree, MoldWithCavity) linked to it.  Editing a
+parameter recomputes only what depends on it:
+
+    side            everything
+    WIDTH, ANG      the strap outline, so filigree, tile groove and mold cavity
+    THICK, RECESS,  tile, filigree and mold, reusing the strap outline
+    EMBEDDING
+    MOLD_BUFFER     the mold only
+    *_COLOR         no geometry at all, just the view colors
+
+FreeCAD recomputes every part linked to the edited object.  Each part
+therefore remembers the parameters it was last built from and keeps its
+shape when none of them changed.  The strap outline is shared between the
+parts of a tile through a small in-memory table.
+
+    import parametric
+    params = parametric.make_tile(App.ActiveDocument, "pange")
+    params.WIDTH = 7
+    App.ActiveDocument.recompute()
+
+The proxies live in this module, so this directory must be importable
+when a saved document is opened again.
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import girih
+import strapwork
+
+LENGTHS = ("side", "THICK", "RECESS", "EMBEDDING", "WIDTH", "MOLD_BUFFER")
+COLORS = ("TILE_COLOR", "LINE_COLOR")
+
+# The parameters each stage reads; a part is rebuilt only when one of its own changed.
+STRAP_PARAMS = ("side", "WIDTH", "ANG")
+PART_PARAMS = {
+    "BaseTile":       STRAP_PARAMS + ("THICK", "RECESS", "EMBEDDING"),
+    "Filigree":       STRAP_PARAMS + ("THICK", "RECESS", "EMBEDDING"),
+    "MoldWithCavity": STRAP_PARAMS + ("THICK", "RECESS", "MOLD_BUFFER"),
+}
+
+# Strap outlines of recently built tiles, {(tile, side, WIDTH, ANG): faces}
+STRAP_CACHE_SIZE = 16
+_straps = {}
+
+
+# ─── Stages ────────────────────────────────────────────────────────────────────
+
+def strap_region(name, p):
+    """The unioned strap outline of tile ``name``, shared by all its parts."""
+    key = (name,) + tuple(float(p[k]) for k in STRAP_PARAMS)
+    if key not in _straps:
+        _, wedge, _ = girih.LAYOUTS[name](p)
+        if len(_straps) >= STRAP_CACHE_SIZE:
+            del _straps[next(iter(_straps))]
+        _straps[key] = strapwork.strap_region(p, wedge, girih.SYMMETRY[name])
+    return _straps[key]
+
+
+def build_part(name, part, p):
+    """One part of tile ``name``, built from the shared strap outline."""
+    verts, wedge, mold_verts = girih.LAYOUTS[name](p)
+    straps = strap_region(name, p)
+    if part == "MoldWithCavity":
+        outline = [(v.x, v.y) for v in verts]
+        return girih.finish_mold(girih.mold_body(name, p, mold_verts),
+                                 strapwork.mold_cavity(p, outline, straps))
+    tile, filigree = girih.tile_and_filigree(p, verts, wedge, girih.SYMMETRY[name],
+                                             straps=straps, parts=(part,))
+    return tile if part == "BaseTile" else filigree
+
+
+# ─── Document objects ──────────────────────────────────────────────────────────
+
+def _params(obj):
+    """The parameter dict of a ``GirihTile`` object, lengths in mm."""
+    p = {k: float(getattr(obj, k).Value) for k in LENGTHS}
+    p["ANG"] = float(obj.ANG.Value)
+    for k in COLORS:
+        p[k] = tuple(round(255 * c) for c in getattr(obj, k)[:3])
+    return p
+
+
+def _apply_colors(obj):
+    p = _params(obj)
+    colors = {"BaseTile": p["TILE_COLOR"], "Filigree": p["LINE_COLOR"]}
+    for part in obj.InList:
+        vo = getattr(part, "ViewObject", None)
+        if vo is not None and getattr(part, "Part", None) in colors:
+            vo.ShapeColor = girih.rgb(colors[part.Part])
+
+
+class GirihTile:
+    """Proxy of the object holding a tile's parameters; it has no shape."""
+
+    def __init__(self, obj, name, params):
+        obj.addProperty("App::PropertyString", "Tile", "Girih", "Tile type")
+        obj.Tile = name
+        obj.setEditorMode("Tile", 1)
+        for k in LENGTHS:
+            obj.addProperty("App::PropertyLength", k, "Girih", k)
+            setattr(obj, k, params[k])
+        obj.addProperty("App::PropertyAngle", "ANG", "Girih", "End-cut angle from perpendicular")
+        obj.ANG = params["ANG"]
+        for k in COLORS:
+            obj.addProperty("App::PropertyColor", k, "Colors", k)
+            setattr(obj, k, girih.rgb(params[k]))
+            obj.setPropertyStatus(k, "NoRecompute")   # colors touch no geometry
+        obj.Proxy = self
+
+    def execute(self, obj):
+        pass
+
+    def onChanged(self, obj, prop):
+        if prop in COLORS and "Restore" not in obj.State:
+            _apply_colors(obj)
+
+    def dumps(self):
+        return None
+
+    def loads(self, state):
+        return None
+
+
+class TilePart:
+    """Proxy of one part; rebuilds only when a parameter it reads changed."""
+
+    def __init__(self, obj, source, part):
+        obj.addProperty("App::PropertyLink", "Source", "Girih", "Tile parameters")
+        obj.addProperty("App::PropertyString", "Part", "Girih", "Which part of the tile")
+        obj.addProperty("App::PropertyString", "BuiltFrom", "Girih", "Parameters of the shape")
+        obj.Source = source
+        obj.Part = part
+        obj.setEditorMode("Part", 1)
+        obj.setEditorMode("BuiltFrom", 2)
+        obj.Proxy = self
+
+    def execute(self, obj):
+        p = _params(obj.Source)
+        stamp = json.dumps({k: p[k] for k in PART_PARAMS[obj.Part]}, sort_keys=True)
+        if stamp == obj.BuiltFrom and not obj.Shape.isNull():
+            return                                  # nothing it reads changed
+        name = obj.Source.Tile
+        with girih.instrument.section(name, "recompute_" + obj.Part):
+            obj.Shape = build_part(name, obj.Part, girih.tile_params(name, p))
+        obj.BuiltFrom = stamp
+
+    def dumps(self):
+        return None
+
+    def loads(self, state):
+        return None
+
+
+def make_tile(doc, name, params=None, outputs=None):
+    """
+    Add tile ``name`` to ``doc`` as a parametric object with one linked
+    part per requested output (see ``girih.select_parts``), in a group.
+    Returns the parameter object.
+    """
+    import FreeCAD as App
+    p = girih.tile_params(name, params)
+    source = doc.addObject("App::FeaturePython", name.capitalize() + "Params")
+    GirihTile(source, name, p)
+    group = doc.addObject("App::DocumentObjectGroup", name.capitalize())
+    group.addObject(source)
+    for part in girih.select_parts(outputs):
+        obj = doc.addObject("Part::FeaturePython", part)
+        TilePart(obj, source, part)
+        group.addObject(obj)
+        if App.GuiUp:
+            obj.ViewObject.Proxy = 0                # the stock Part view provider
+            obj.ViewObject.Visibility = part != "MoldWithCavity"
+            if part == "MoldWithCavity":
+                obj.ViewObject.ShapeColor = (0.5, 0.5, 0.5)
+    doc.recompute()
+    if App.GuiUp:
+        _apply_colors(source)
+    return source
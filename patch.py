@@ -0,0 +1,96 @@
+"""
+Patch assembler: lay out many tiles without copying any shapes.
+
+A layout is a list of ``(tile, x, y, rotation)`` entries, positions in mm
+and rotations in degrees about Z.  Each tile type in it is built once
+(through ``girih.build_tile`` and so the shape cache) and put in the
+document as a hidden prototype; the placed tiles are then ``App::Link``
+arrays, one per tile type, holding nothing but a placement per tile.
+Memory and load time grow with the number of tile types, not tiles.
+
+    import patch
+    layout = patch.read_layout("panel.csv")
+    patch.assemble(App.newDocument("Panel"), layout)
+
+All tiles of a patch share one set of parameters, so that their sides match.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import girih
+from tiling import read_layout  # noqa: F401  (layouts are read with patch.read_layout)
+
+
+# ─── Layouts as plain data ─────────────────────────────────────────────────────
+
+def by_type(layout):
+    """``{tile: [(x, y, rotation), ...]}`` in the order tile types first appear."""
+    groups = {}
+    for name, x, y, rot in layout:
+        if name not in girih.LAYOUTS:
+            raise KeyError("Unknown tile %r, expected one of %s" % (name, ", ".join(girih.LAYOUTS)))
+        groups.setdefault(name, []).append((x, y, rot))
+    return groups
+
+
+# ─── Document ──────────────────────────────────────────────────────────────────
+
+def _placement(x, y, rot):
+    import FreeCAD as App
+    return App.Placement(App.Vector(x, y, 0), App.Rotation(App.Vector(0, 0, 1), rot))
+
+
+def prototypes(doc, names, params=None, parts=("BaseTile", "Filigree")):
+    """
+    Build every tile type in ``names`` once and add it to ``doc`` as an
+    ``App::Part`` holding the requested parts.  Returns ``{tile: part}``.
+    The prototypes are gathered in a hidden group.
+    """
+    p = girih.with_defaults(params)
+    group = doc.addObject("App::DocumentObjectGroup", "Prototypes")
+    protos = {}
+    for name in names:
+        shapes = dict(zip(girih.PARTS, girih.build_tile(name, p, outputs=parts)))
+        container = doc.addObject("App::Part", name.capitalize())
+        for part in parts:
+            obj = doc.addObject("Part::Feature", "%s_%s" % (name.capitalize(), part))
+            obj.Shape = shapes[part]
+            container.addObject(obj)
+            if obj.ViewObject is not None:
+                color = {"BaseTile": p["TILE_COLOR"], "Filigree": p["LINE_COLOR"]}.get(part)
+                obj.ViewObject.ShapeColor = girih.rgb(color) if color else (0.5, 0.5, 0.5)
+        group.addObject(container)
+        if container.ViewObject is not None:
+            container.ViewObject.Visibility = False
+        protos[name] = container
+    return protos
+
+
+def assemble(doc, layout, params=None, parts=("BaseTile", "Filigree"), lod=False):
+    """
+    Place every tile of ``layout`` in ``doc`` as an element of an
+    ``App::Link`` array on its type's prototype.  Returns ``{tile: link}``.
+    With ``lod`` and a GUI, the link arrays are hidden and the tiles are
+    drawn by ``lod.show`` instead, flat until zoomed in on.
+    """
+    groups = by_type(layout)
+    protos = prototypes(doc, groups, params, parts)
+
+    links = {}
+    panel = doc.addObject("App::DocumentObjectGroup", "Patch")
+    for name, placed in groups.items():
+        link = doc.addObject("App::Link", "%s_Instances" % name.capitalize())
+        link.setLink(protos[name])
+        link.ShowElement = False          # no per-tile document objects
+        link.ElementCount = len(placed)
+        link.PlacementList = [_placement(*t) for t in placed]
+        panel.addObject(link)
+        links[name] = link
+    doc.recompute()
+    if lod and panel.ViewObject is not None:
+        import lod as level_of_detail
+        for link in links.values():
+            link.ViewObject.Visibility = False
+        level_of_detail.show(layout, params)
+    return links
@@ -0,0 +1,255 @@
+"""
+Interactive tile editing: an instant 2D preview, then the solids.
+
+A ``Session`` shows one tile in the active document.  Every ``update``
+first draws the tile outline and the strap centerlines straight into the
+3D view (polygon-walk math and the bar layout, no OCC at all), then
+builds the solids in a ``FreeCADCmd`` worker process, part by part, and
+swaps them in for the preview when they are done.  Editing again while a
+build is running kills that worker and starts a new one.
+
+    import preview
+    s = preview.Session(App.ActiveDocument, "pange", params)
+    s.update(WIDTH=7)           # returns at once
+    s.update(side=60)           # the WIDTH=7 worker is killed
+
+The worker hands each part back as BREP text on its standard output,
+like the ``stitch`` workers, so OCC never runs in the GUI process: the
+console stays responsive during a boolean, and the build never touches
+this process's memo tables.  FreeCAD's GUI binary cannot be spawned as a
+worker, so the command is ``GIRIH_FREECADCMD`` (default ``FreeCADCmd``).
+Without a GUI there is nothing to draw; call ``poll`` to pick up finished
+builds.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import girih
+import kernel
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FREECADCMD = os.environ.get("GIRIH_FREECADCMD", "FreeCADCmd")
+POLL_MS = 100                   # how often the GUI checks for finished builds
+MARK = "GIRIH-PART "            # prefix of the worker's result lines
+
+
+# ─── Preview geometry ──────────────────────────────────────────────────────────
+
+def centerlines(name, p):
+    """The strap centerlines of tile ``name`` as an (N, 2, 2) array of segments."""
+    import strapwork
+    _, wedge, _ = girih.LAYOUTS[name](p)
+    L, rot, base, _, _ = zip(*wedge)
+    L    = np.asarray(L, dtype=float)
+    rot  = np.radians(np.asarray(rot, dtype=float))
+    base = np.asarray(base, dtype=float)[:, :2]
+    half = 0.5*L[:, None] * np.stack([np.cos(rot), np.sin(rot)], axis=1)
+    segments = np.stack([base - half, base + half], axis=1)
+    n, mirror = girih.SYMMETRY[name]
+    return strapwork.symmetry_images(segments, n, mirror)
+
+
+def _lines(polylines, z, color):
+    """A separator drawing ``polylines`` ((x, y) point lists) at height ``z``."""
+    from pivy import coin
+    points = [(float(x), float(y), z) for line in polylines for x, y in line]
+    sep = coin.SoSeparator()
+    material = coin.SoMaterial()
+    material.diffuseColor.setValue(*girih.rgb(color))
+    style = coin.SoDrawStyle()
+    style.lineWidth = 2
+    coords = coin.SoCoordinate3()
+    coords.point.setValues(0, len(points), points)
+    lines = coin.SoLineSet()
+    lines.numVertices.setValues(0, len(polylines), [len(line) for line in polylines])
+    for node in (material, style, coords, lines):
+        sep.addChild(node)
+    return sep
+
+
+def preview_node(name, p):
+    """The outline in ``TILE_COLOR`` and the centerlines in ``LINE_COLOR``."""
+    from pivy import coin
+    outline = kernel.outline(name, p["side"])
+    root = coin.SoSeparator()
+    root.addChild(_lines([np.vstack([outline, outline[:1]])], p["THICK"] - p["RECESS"],
+                         p["TILE_COLOR"]))
+    root.addChild(_lines(list(centerlines(name, p)), p["THICK"], p["LINE_COLOR"]))
+    return root
+
+
+# ─── Worker ────────────────────────────────────────────────────────────────────
+
+def serve(job):
+    """
+    Build the parts of ``job`` (JSON: ``name``, ``parts``, ``params``) and
+    write one result line per part, then one for the end, to standard output.
+    Runs in the worker process.
+    """
+    import parametric
+    job = json.loads(job)
+
+    def send(result):
+        os.write(1, (MARK + json.dumps(result) + "\n").encode())
+
+    try:
+        for part in job["parts"]:
+            shape = parametric.build_part(job["name"], part, job["params"])
+            send({"part": part, "brep": shape.exportBrepToString()})
+    except Exception as exc:
+        send({"error": "%s: %s" % (type(exc).__name__, exc)})
+    else:
+        send({"done": True})
+
+
+def _spawn(name, parts, p):
+    """Start a worker building ``parts`` of tile ``name``."""
+    job = json.dumps({"name": name, "parts": list(parts), "params": p})
+    code = "import sys; sys.path.insert(0, %r); import preview; preview.serve(%r)" % (HERE, job)
+    return subprocess.Popen([FREECADCMD, "-c", code], stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+
+def _read(proc, generation, done):
+    """Pass the worker's results on to ``done`` as ``(generation, result)``."""
+    ended, said = False, ""
+    for line in proc.stdout:
+        line = line.decode(errors="replace")
+        if line.startswith(MARK):
+            result = json.loads(line[len(MARK):])
+            ended = "part" not in result
+            done.put((generation, result))
+        elif line.strip():
+            said = line.strip()                 # the worker's last words, for errors
+    code = proc.wait()
+    if not ended:
+        done.put((generation, {"error": "worker exited with %s%s"
+                                        % (code, ": " + said if said else "")}))
+
+
+# ─── Session ───────────────────────────────────────────────────────────────────
+
+class Session:
+    """One tile shown in ``doc``, previewed at once and built in a worker process."""
+
+    def __init__(self, doc, name, params=None, outputs=None):
+        self.doc = doc
+        self.name = name
+        self.params = girih.tile_params(name, params)
+        self.parts = girih.select_parts(outputs)
+        self.generation = 0
+        self.objects = {}
+        self._node = None
+        self._worker = None
+        self._breps = {}
+        self._done = queue.Queue()
+        self._timer = None
+        try:
+            import FreeCAD as App
+            if App.GuiUp:
+                from PySide import QtCore
+                self._timer = QtCore.QTimer()
+                self._timer.timeout.connect(self.poll)
+                self._timer.start(POLL_MS)
+        except ImportError:
+            pass
+        self.update()
+
+    # The view
+    def _scene(self):
+        import FreeCAD as App
+        if not App.GuiUp:
+            return None
+        import FreeCADGui as Gui
+        return Gui.getDocument(self.doc.Name).ActiveView.getSceneGraph()
+
+    def _show_preview(self, p):
+        scene = self._scene()
+        if scene is None:
+            return
+        self._hide_preview()
+        self._node = preview_node(self.name, p)
+        scene.addChild(self._node)
+        for obj in self.objects.values():
+            obj.ViewObject.Visibility = False   # stale until the build lands
+
+    def _hide_preview(self):
+        if self._node is not None:
+            self._scene().removeChild(self._node)
+            self._node = None
+
+    # Editing
+    def update(self, **changes):
+        """Apply ``changes`` to the parameters: preview now, solids later."""
+        p = girih.tile_params(self.name, dict(self.params, **changes))
+        self.params = p
+        self.generation += 1
+        self._show_preview(p)
+        self._stop()
+        self._breps = {}
+        self._worker = _spawn(self.name, self.parts, p)
+        threading.Thread(target=_read, args=(self._worker, self.generation, self._done),
+                         daemon=True).start()
+
+    def _stop(self):
+        if self._worker is not None and self._worker.poll() is None:
+            self._worker.kill()                 # edited again: drop this build
+        self._worker = None
+
+    def poll(self):
+        """Put the newest finished build into the document, if it is current."""
+        finished = False
+        while True:
+            try:
+                generation, result = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                continue
+            if "error" in result:
+                import FreeCAD as App
+                App.Console.PrintError("%s build failed: %s\n" % (self.name, result["error"]))
+                return False
+            if "part" in result:
+                self._breps[result["part"]] = result["brep"]
+            else:
+                finished = True
+        if not finished:
+            return False
+        import Part
+        shapes = {}
+        for part, brep in self._breps.items():
+            shapes[part] = Part.Shape()
+            shapes[part].importBrepFromString(brep)
+        self._breps = {}
+        self._apply(shapes)
+        return True
+
+    def _apply(self, shapes):
+        p = self.params
+        colors = {"BaseTile": p["TILE_COLOR"], "Filigree": p["LINE_COLOR"]}
+        for part, shape in shapes.items():
+            obj = self.objects.get(part)
+            if obj is None:
+                obj = self.objects[part] = self.doc.addObject("Part::Feature", part)
+            obj.Shape = shape
+            if obj.ViewObject is not None:
+                obj.ViewObject.ShapeColor = girih.rgb(colors.get(part, (128, 128, 128)))
+                obj.ViewObject.Visibility = part != "MoldWithCavity"
+        self._hide_preview()
+        self.doc.recompute()
+
+    def close(self):
+        """Stop the build and remove the preview; the solids stay."""
+        self.generation += 1
+        self._stop()
+        if self._timer is not None:
+            self._timer.stop()
+        self._hide_preview()
@@ -0,0 +1,264 @@
+"""
+Tile service: a local HTTP endpoint in front of warm build workers.
+
+Starting an interpreter and importing ``Part`` takes seconds, more than
+building a small tile.  The service starts a pool of worker processes once,
+each importing FreeCAD and the tile modules up front, and hands every
+request to a worker that is already warm.  Identical requests arriving
+while one is being built wait for that build instead of starting their own.
+
+    python service.py --port 8765 -j 4
+
+    POST /build    a JSON request, answered with a ZIP of the exported
+                   files plus ``result.json`` (or the failed result as JSON)
+    GET  /status   worker count, builds in flight, counters
+
+A request names one tile and is otherwise a one-tile sweep spec (see
+``batch.py``), every key but "tile" optional:
+
+    {"tile": "pange", "params": {"side": 2}, "units": "inch",
+     "formats": ["stl"], "outputs": ["tile", "filigree"], "scale": 1.1}
+
+    curl -s -d '{"tile": "pange"}' localhost:8765/build -o pange.zip
+
+It listens on localhost only, unless told otherwise; ``request`` is a
+small client for scripts and for trying it out.
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import urllib.request
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import batch
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+# ─── Requests → jobs ───────────────────────────────────────────────────────────
+
+def job_from_request(request):
+    """The ``batch`` job for a request dict; raises ValueError if it is malformed."""
+    if not isinstance(request, dict) or "tile" not in request:
+        raise ValueError('A request is a JSON object naming a "tile"')
+    unknown = set(request) - {"tile", "params", "units", "formats", "outputs", "scale"}
+    if unknown:
+        raise ValueError("Unknown request key(s): %s" % ", ".join(sorted(unknown)))
+    params = request.get("params", {})
+    if not isinstance(params, dict):
+        raise ValueError('"params" must be an object')
+    unknown = set(params) - set(batch.PARAMS)
+    if unknown:
+        raise ValueError("Unknown tile parameter(s): %s" % ", ".join(sorted(unknown)))
+    for k in ("formats", "outputs"):
+        if k in request and not isinstance(request[k], list):
+            raise ValueError('"%s" must be a list' % k)
+    spec = {k: request[k] for k in ("params", "units", "formats", "outputs") if k in request}
+    spec["tiles"] = [request["tile"]]
+    try:
+        spec["scale"] = [float(request.get("scale", 1.0))]
+        job, = batch.expand(spec)
+    except (KeyError, TypeError) as exc:
+        raise ValueError("Bad request: %s" % exc)
+    job["label"] = job_key(job)[:16]
+    return job
+
+
+def job_key(job):
+    """Digest of everything that decides what a job produces."""
+    data = {k: job[k] for k in ("name", "params", "scale", "formats", "outputs")}
+    data["params"] = {k: float(v) if isinstance(v, (int, float)) else v
+                      for k, v in data["params"].items()}
+    data["formats"], data["outputs"] = sorted(data["formats"]), sorted(data["outputs"])
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# ─── Workers ───────────────────────────────────────────────────────────────────
+
+def _warm():
+    """Pay the imports once per worker, before its first job."""
+    import girih       # noqa: F401  (imports FreeCAD and Part)
+    import meshwriter  # noqa: F401
+    import shapecache  # noqa: F401
+
+
+def _archive(result):
+    """A ZIP of the job's files and its result."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path in result["files"]:
+            zf.write(path, os.path.basename(path))
+        zf.writestr("result.json", json.dumps(result, indent=2))
+    return buf.getvalue()
+
+
+class Service:
+    """
+    A warm worker pool that coalesces identical requests in flight.  Jobs
+    are run by ``run_job`` (``batch.run_job``) after ``warm`` in each worker;
+    both must be picklable module-level functions.
+    """
+
+    def __init__(self, workers=None, work_dir=None, run_job=batch.run_job, warm=_warm):
+        self.workers = workers or os.cpu_count() or 1
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="girih_service_")
+        self.run_job = run_job
+        self.warm = warm
+        self.stats = {"builds": 0, "coalesced": 0, "failed": 0, "restarts": 0}
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._runs = itertools.count()
+        self._pool = self._start_pool()
+
+    def _start_pool(self):
+        pool = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=self.warm)
+        # Start every worker now, so the first requests find them warm
+        concurrent.futures.wait([pool.submit(self.warm) for _ in range(self.workers)])
+        return pool
+
+    def build(self, job):
+        """
+        ``(result, archive)`` for ``job``, blocking until it is built.  A job
+        identical to one in flight shares that build instead of starting one.
+        """
+        key = job_key(job)
+        with self._lock:
+            shared = self._inflight.get(key)
+            if shared is None:
+                shared = self._inflight[key] = concurrent.futures.Future()
+                mine = True
+            else:
+                self.stats["coalesced"] += 1
+                mine = False
+        if not mine:
+            return shared.result()
+        try:
+            shared.set_result(self._run(job))
+        except Exception as exc:
+            shared.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return shared.result()
+
+    def _run(self, job):
+        # Each run gets its own directory, so a later identical job cannot
+        # overwrite files still being read
+        out_dir = os.path.join(self.work_dir, str(next(self._runs)))
+        pool = self._pool
+        try:
+            result = pool.submit(self.run_job, job, out_dir).result()
+        except BrokenProcessPool:
+            result = batch._died(job, out_dir)
+            with self._lock:
+                if self._pool is pool:            # the first to notice restarts it
+                    self._pool = self._start_pool()
+                    self.stats["restarts"] += 1
+        with self._lock:
+            self.stats["builds"] += 1
+            self.stats["failed"] += result["status"] != "ok"
+        try:
+            return result, _archive(result) if result["status"] == "ok" else None
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats, workers=self.workers, inflight=len(self._inflight))
+
+    def close(self):
+        self._pool.shutdown()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+# ─── HTTP ──────────────────────────────────────────────────────────────────────
+
+class Handler(BaseHTTPRequestHandler):
+    service = None          # set by serve()
+
+    def _send(self, code, body, content_type="application/json"):
+        if content_type == "application/json":
+            body = json.dumps(body, indent=2).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/status":
+            return self._send(404, {"error": "not found"})
+        self._send(200, self.service.status())
+
+    def do_POST(self):
+        if self.path != "/build":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = job_from_request(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as exc:          # includes malformed JSON
+            return self._send(400, {"error": str(exc)})
+        try:
+            result, archive = self.service.build(job)
+        except Exception as exc:
+            return self._send(500, {"error": "%s: %s" % (type(exc).__name__, exc)})
+        if archive is None:
+            return self._send(500, result)
+        self._send(200, archive, "application/zip")
+
+
+def serve(host=HOST, port=PORT, workers=None, work_dir=None):
+    """Run the service until interrupted."""
+    service = Service(workers, work_dir)
+    Handler.service = service
+    server = ThreadingHTTPServer((host, port), Handler)
+    sys.stderr.write("girih service on http://%s:%d with %d warm worker(s)\n"
+                     % (server.server_address[0], server.server_address[1], service.workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+# ─── Client ────────────────────────────────────────────────────────────────────
+
+def request(req, url="http://%s:%d" % (HOST, PORT), timeout=600):
+    """
+    Send ``req`` (a request dict) to the service and return the ZIP bytes.
+    A failed build raises ``urllib.error.HTTPError``; its body is the result.
+    """
+    data = json.dumps(req).encode("utf-8")
+    post = urllib.request.Request(url + "/build", data, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(post, timeout=timeout) as response:
+        return response.read()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve Girih tile builds from warm workers.")
+    ap.add_argument("--host", default=HOST, help="address to listen on (default: localhost)")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="worker processes (default: one per CPU)")
+    ap.add_argument("--work", help="scratch directory (default: a temporary one)")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.jobs, args.work)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Content-addressed on-disk cache of built tiles.
+
+An entry is keyed by a hash of the tile name, its geometric parameters and
+the generator version, and holds the tile, filigree and mold as BREP files
+(plus STL meshes, when asked for).  A build that made only some of the
+parts stores those; a later build asking for more adds the rest.  Entries are evicted least recently used
+first once the cache grows past its size cap.
+
+    GIRIH_CACHE=off        disable the cache
+    GIRIH_CACHE_DIR=...    where entries live (default ~/.cache/girih)
+    GIRIH_CACHE_MB=...     size cap in megabytes (default 500)
+
+Hits and misses are counted in ``STATS``; ``report()`` formats them.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import instrument
+
+ENABLED  = os.environ.get("GIRIH_CACHE", "on").lower() not in ("off", "0", "no")
+ROOT     = os.environ.get("GIRIH_CACHE_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "girih"))
+LIMIT_MB = float(os.environ.get("GIRIH_CACHE_MB", 500))
+
+PARTS = ("BaseTile", "Filigree", "MoldWithCavity")
+
+# Parameters that change the geometry.  The colors only affect the document.
+KEY_PARAMS = ("side", "THICK", "RECESS", "EMBEDDING", "WIDTH", "MOLD_BUFFER", "ANG")
+
+STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+# ─── Keys and entries ──────────────────────────────────────────────────────────
+
+def key(name, p, version, engine=""):
+    """Hex digest identifying tile ``name`` built from parameters ``p``."""
+    data = {"tile": name, "version": version, "engine": engine,
+            "params": {k: repr(float(p[k])) for k in KEY_PARAMS}}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def entry_dir(digest, root=None):
+    return os.path.join(root or ROOT, digest[:2], digest)
+
+
+def _touch(directory):
+    """Mark an entry as just used (the LRU clock is the entry's mtime)."""
+    now = time.time()
+    os.utime(directory, (now, now))
+
+
+@instrument.timed("cache_load")
+def load(digest, root=None, parts=PARTS):
+    """
+    The cached ``(tile, filigree, mold)`` shapes, None for those not in
+    ``parts``, or None if any of ``parts`` is missing.
+    """
+    directory = entry_dir(digest, root)
+    paths = {part: os.path.join(directory, part + ".brep") for part in parts}
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+    import Part
+    shapes = tuple(Part.read(paths[part]) if part in paths else None for part in PARTS)
+    _touch(directory)
+    return shapes
+
+
+def store(digest, shapes, meshes=None, root=None):
+    """
+    Write ``shapes`` (those not None, and ``meshes``, ``{part:
+    triangles}``, as STL) into the entry.  The files are written aside and
+    renamed into place, so concurrent workers never see a half-written one.
+    """
+    root = root or ROOT
+    directory = entry_dir(digest, root)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(directory))
+    try:
+        for part, shape in zip(PARTS, shapes):
+            if shape is not None:
+                shape.exportBrep(os.path.join(tmp, part + ".brep"))
+        if meshes:
+            import meshwriter
+            for part, triangles in meshes.items():
+                meshwriter.write_stl(os.path.join(tmp, part + ".stl"), triangles, part)
+        if os.path.isdir(directory):
+            # add to the existing entry file by file
+            for name in os.listdir(tmp):
+                os.replace(os.path.join(tmp, name), os.path.join(directory, name))
+            shutil.rmtree(tmp)
+        else:
+            os.replace(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    STATS["stores"] += 1
+    evict(root=root)
+
+
+def mesh_paths(digest, root=None):
+    """``{part: path}`` of the STL meshes cached for ``digest`` (maybe empty)."""
+    directory = entry_dir(digest, root)
+    paths = {part: os.path.join(directory, part + ".stl") for part in PARTS}
+    return {part: path for part, path in paths.items() if os.path.exists(path)}
+
+
+# ─── Eviction ──────────────────────────────────────────────────────────────────
+
+def entries(root=None):
+    """``[(mtime, bytes, directory), ...]`` for every entry, oldest first."""
+    root = root or ROOT
+    found = []
+    if not os.path.isdir(root):
+        return found
+    for prefix in os.listdir(root):
+        shard = os.path.join(root, prefix)
+        if not os.path.isdir(shard):
+            continue
+        for digest in os.listdir(shard):
+            directory = os.path.join(shard, digest)
+            if digest.startswith(".tmp-") or not os.path.isdir(directory):
+                continue
+            size = sum(f.stat().st_size for f in os.scandir(directory) if f.is_file())
+            found.append((os.stat(directory).st_mtime, size, directory))
+    return sorted(found)
+
+
+def evict(limit_mb=None, root=None):
+    """Drop least recently used entries until the cache fits ``limit_mb``."""
+    limit = (LIMIT_MB if limit_mb is None else limit_mb) * 1024 * 1024
+    found = entries(root)
+    total = sum(size for _, size, _ in found)
+    for _, size, directory in found:
+        if total <= limit:
+            break
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+        STATS["evictions"] += 1
+
+
+# ─── Cached build ──────────────────────────────────────────────────────────────
+
+def cached(name, p, build, version, engine="", meshes=None, root=None, parts=PARTS):
+    """
+    ``build(name, p, parts)`` through the cache.  On a miss the shapes are
+    built and stored; ``meshes``, if given, is called as ``meshes(name, p,
+    parts)`` and its ``{part: triangles}`` stored alongside them.
+    """
+    digest = key(name, p, version, engine)
+    shapes = load(digest, root, parts)
+    if shapes is not None:
+        STATS["hits"] += 1
+        return shapes
+    STATS["misses"] += 1
+    shapes = build(name, p, parts)
+    try:
+        store(digest, shapes, meshes(name, p, parts) if meshes else None, root)
+    except OSError:
+        pass                          # a read-only cache only costs the speed-up
+    return shapes
+
+
+def report(stats=None, root=None):
+    """A one-line summary of ``stats`` (default: this process) and the cache size."""
+    s = stats or STATS
+    looked_up = s["hits"] + s["misses"]
+    rate = 100.0 * s["hits"] / looked_up if looked_up else 0.0
+    found = entries(root)
+    return ("cache: %d hit(s), %d miss(es) (%.0f%% hit rate), %d evicted; "
+            "%.1f MB in %d entr%s at %s" % (
+                s["hits"], s["misses"], rate, s["evictions"],
+                sum(size for _, size, _ in found) / (1024 * 1024), len(found),
+                "y" if len(found) == 1 else "ies", root or ROOT))
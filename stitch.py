@@ -0,0 +1,220 @@
+"""
+Panel filigree: one continuous strap across all the tiles of a layout.
+
+One fuse of thousands of filigree solids does not finish, so the panel is
+cut into square cells and each cell is unioned on its own, in the plane
+like ``strapwork``: the strap outline of every tile reaching into the cell
+(each tile type's outline is unioned once and placed), fused and clipped
+to the cell.  A cell only ever sees the few tiles around it, so the cost
+grows with the panel's area, and the cells run in parallel.  Clipped
+cells meet exactly along their seams; stitching fuses those shared edges
+away in rounds, neighbouring cells pairwise across x, then across y, and
+so on, each round's merges in parallel too, until one region is left.  It
+is extruded once.  Only the last rounds fuse large regions, and they have
+few merges left to run side by side; ``--no-stitch`` skips the rounds and
+keeps the cells as separate pieces when one continuous strap is not needed.
+
+    import stitch
+    filigree = stitch.panel_filigree(patch.read_layout("panel.csv"), params, workers=8)
+    filigree.exportBrep("panel_filigree.brep")
+
+    python stitch.py panel.csv -o panel_filigree.brep -j 8
+
+Cells are ``CELL`` tile sides wide.  Workers are separate processes and
+hand their cells back as BREP text.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import kernel
+
+CELL = 6.0                      # cell width in tile sides
+
+
+# ─── Cells ─────────────────────────────────────────────────────────────────────
+
+def reach(name, p):
+    """Radius around a tile's origin that its straps stay within."""
+    return float(np.abs(kernel.outline(name, p["side"])).max()) + p["WIDTH"]
+
+
+def cells(layout, p, cell=CELL):
+    """
+    ``{(i, j): [(tile, x, y, rotation), ...]}``: for each cell ``cell``
+    tile sides wide, every tile whose straps may reach into it.
+    """
+    size = cell * p["side"]
+    radius = {name: reach(name, p) for name in {name for name, *_ in layout}}
+    found = {}
+    for entry in layout:
+        name, x, y, _ = entry
+        r = radius[name]
+        for i in range(math.floor((x - r) / size), math.floor((x + r) / size) + 1):
+            for j in range(math.floor((y - r) / size), math.floor((y + r) / size) + 1):
+                found.setdefault((i, j), []).append(entry)
+    return found
+
+
+# ─── One cell (in a worker) ────────────────────────────────────────────────────
+
+_regions = {}                   # strap outline per (tile, parameters), per process
+
+
+def _strap_region(name, p):
+    import girih
+    import strapwork
+    key = (name,) + tuple(sorted((k, v) for k, v in p.items() if not k.endswith("_COLOR")))
+    if key not in _regions:
+        _, wedge, _ = girih.LAYOUTS[name](p)
+        _regions[key] = strapwork.strap_region(p, wedge, girih.SYMMETRY[name])
+    return _regions[key]
+
+
+def cell_region(key, tiles, p, cell=CELL):
+    """
+    The panel's strap outline inside cell ``key`` as planar faces, from the
+    ``tiles`` reaching into it, or None if nothing is left in the cell.
+    """
+    import Part
+    from FreeCAD import Base
+    import strapwork
+
+    faces = []
+    for name, x, y, rotation in tiles:
+        placement = Base.Placement(Base.Vector(x, y, 0), Base.Rotation(Base.Vector(0, 0, 1), rotation))
+        for face in _strap_region(name, p).Faces:
+            face = face.copy(False)
+            face.Placement = placement.multiply(face.Placement)
+            faces.append(face)
+    size = cell * p["side"]
+    box = Part.makePlane(size, size, Base.Vector(key[0] * size, key[1] * size, 0))
+    clipped = strapwork.fuse_faces(faces).common(box)
+    if not clipped.Faces:
+        return None
+    return strapwork.refine(clipped)
+
+
+def merge_regions(a, b):
+    """Two neighbouring regions fused along their seam."""
+    import strapwork
+    return strapwork.refine(strapwork.fuse_faces(a.Faces + b.Faces))
+
+
+def _from_brep(brep):
+    import Part
+    shape = Part.Shape()
+    shape.importBrepFromString(brep)
+    return shape
+
+
+def _cell_brep(key, tiles, p, cell):
+    region = cell_region(key, tiles, p, cell)
+    return None if region is None else region.exportBrepToString()
+
+
+def _merge_brep(a, b):
+    return merge_regions(_from_brep(a), _from_brep(b)).exportBrepToString()
+
+
+# ─── Panel ─────────────────────────────────────────────────────────────────────
+
+def _stitch_round(regions, axis, run, merge):
+    """
+    ``regions`` by cell key with every pair of neighbours across ``axis``
+    (counting from the lowest index, cells 2k and 2k + 1) merged, keyed by
+    that count halved.
+    """
+    low = min(key[axis] for key in regions)
+    groups = {}
+    for key, region in regions.items():
+        half = list(key)
+        half[axis] = (half[axis] - low) // 2
+        groups.setdefault(tuple(half), []).append(region)
+    pairs = {key: group for key, group in groups.items() if len(group) == 2}
+    out = {key: group[0] for key, group in groups.items() if len(group) == 1}
+    out.update(zip(pairs, run(merge, [a for a, _ in pairs.values()],
+                              [b for _, b in pairs.values()])))
+    return out
+
+
+def panel_straps(layout, params=None, cell=CELL, workers=None, stitch=True):
+    """
+    The strap outline of a whole layout as planar faces, cell by cell on
+    ``workers`` processes (1: in this process).  With ``stitch`` the cells
+    are fused along their seams, pairwise in rounds on the same workers;
+    without, the result is a compound of the clipped cells.  An empty
+    layout gives an empty compound either way.
+    """
+    import girih
+    import Part
+
+    p = girih.with_defaults(params)
+    todo = cells(layout, p, cell)
+    if workers == 1:
+        pool, run = None, lambda fn, *args: list(map(fn, *args))
+        make_cell, merge, load = cell_region, merge_regions, (lambda region: region)
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(workers)
+        run = lambda fn, *args: list(pool.map(fn, *args))          # noqa: E731
+        make_cell, merge, load = _cell_brep, _merge_brep, _from_brep
+
+    with pool or contextlib.nullcontext():
+        with girih.instrument.section("panel", "cells"):
+            built = run(make_cell, todo, todo.values(), [p] * len(todo), [cell] * len(todo))
+            regions = {key: region for key, region in zip(todo, built) if region is not None}
+        if not stitch:
+            return Part.makeCompound([f for region in regions.values()
+                                      for f in load(region).Faces])
+        if not regions:
+            return Part.makeCompound([])        # no cell has straps
+        with girih.instrument.section("panel", "stitch"):
+            axis = 0
+            while len(regions) > 1:
+                regions = _stitch_round(regions, axis, run, merge)
+                axis = 1 - axis
+    region, = regions.values()
+    return load(region)
+
+
+def panel_filigree(layout, params=None, cell=CELL, workers=None, stitch=True):
+    """The filigree of a whole layout: ``panel_straps`` extruded like a tile's."""
+    import girih
+    import strapwork
+    p = girih.with_defaults(params)
+    straps = panel_straps(layout, p, cell, workers, stitch)
+    if not straps.Faces:
+        raise ValueError("The layout has no straps to build a filigree from")
+    return strapwork.filigree_solid(p, straps)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build one continuous filigree for a panel.")
+    ap.add_argument("layout", help="layout CSV or JSON (see patch.read_layout)")
+    ap.add_argument("-o", "--out", default="panel_filigree.brep", help="BREP file to write")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="worker processes (default: one per CPU)")
+    ap.add_argument("--cell", type=float, default=CELL, help="cell width in tile sides")
+    ap.add_argument("--no-stitch", action="store_true",
+                    help="keep the cells as separate pieces meeting at their seams")
+    args = ap.parse_args(argv)
+
+    import tiling
+    layout = tiling.read_layout(args.layout)
+    start = time.perf_counter()
+    shape = panel_filigree(layout, cell=args.cell, workers=args.jobs, stitch=not args.no_stitch)
+    shape.exportBrep(args.out)
+    sys.stderr.write("%d tiles → %s in %.1fs\n" % (len(layout), args.out,
+                                                   time.perf_counter() - start))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
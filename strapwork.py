@@ -0,0 +1,171 @@
+"""
+2D strapwork engine.
+
+Every part of a Girih tile is a planar profile extruded along Z, so the
+filigree can be unioned in the plane and extruded exactly once.  The bar
+corners for a whole tile are computed together as NumPy arrays, the
+symmetry images are a single matrix product, and the only OCC booleans are
+on flat faces.
+
+A bar is described by the same values ``girih.make_prism`` takes:
+``(L, rot, base, half1, half2)``.
+"""
+import numpy as np
+
+import Part
+from FreeCAD import Base
+
+import instrument
+from kernel import bar_corners
+
+
+# ─── Bar outlines ──────────────────────────────────────────────────────────────
+# The corners of one wedge of bars come from ``kernel.bar_corners``.
+
+def symmetry_images(polys, n, mirror=False):
+    """
+    Images of an (N, K, 2) polygon array under C_n, or D_n if ``mirror`` is
+    set, in the order ``girih.replicate`` produces them.  Mirrored polygons
+    have their vertex order reversed so every polygon stays counterclockwise.
+    """
+    stacks = [polys]
+    if mirror:
+        stacks.append((polys * np.array([-1.0, 1.0]))[:, ::-1, :])
+    stacks = np.stack(stacks)                          # (B, N, K, 2)
+
+    t = np.radians(360.0*np.arange(n)/n)
+    R = np.stack([np.stack([np.cos(t), -np.sin(t)], axis=1),
+                  np.stack([np.sin(t),  np.cos(t)], axis=1)], axis=1)   # (n, 2, 2)
+
+    images = np.einsum("kij,bnvj->bknvi", R, stacks)
+    return images.reshape(-1, polys.shape[1], 2)
+
+
+def filigree_polygons(p, wedge, symmetry):
+    """All bar outlines of a tile as an (N, 4, 2) array."""
+    n, mirror = symmetry
+    return symmetry_images(bar_corners(wedge, p["WIDTH"], p["ANG"]), n, mirror)
+
+
+# ─── Planar faces ──────────────────────────────────────────────────────────────
+
+def polygon_face(poly):
+    """A planar face at z = 0 from a sequence of (x, y) points."""
+    verts = [Base.Vector(float(x), float(y), 0) for x, y in poly]
+    return Part.Face(Part.makePolygon(verts + [verts[0]]))
+
+
+def union_faces(polys):
+    """
+    Union a stack of polygons in the plane.  The result's ``Faces`` are the
+    merged regions, with holes where the straps close around a gap.
+    """
+    return refine(fuse_faces([polygon_face(q) for q in polys]))
+
+
+@instrument.timed("strap_fuse")
+def fuse_faces(faces):
+    """The union of planar ``faces``, one multiFuse; seams are left in (see ``refine``)."""
+    return faces[0].multiFuse(faces[1:]) if len(faces) > 1 else faces[0]
+
+
+@instrument.timed("removeSplitter")
+def refine(shape):
+    """``shape`` with the edges between coplanar pieces removed."""
+    return shape.removeSplitter()
+
+
+@instrument.timed("extrude")
+def extrude_faces(region, z0, height):
+    """Extrude every face of ``region`` by ``height`` and lift it to ``z0``."""
+    solids = [f.extrude(Base.Vector(0, 0, height)) for f in region.Faces]
+    shape = solids[0] if len(solids) == 1 else Part.makeCompound(solids)
+    shape.translate(Base.Vector(0, 0, z0))
+    return shape
+
+
+# ─── Tile and filigree ─────────────────────────────────────────────────────────
+
+def strap_region(p, wedge, symmetry):
+    """The unioned strap outline of a whole tile, as planar faces."""
+    return union_faces(filigree_polygons(p, wedge, symmetry))
+
+
+def filigree_solid(p, straps):
+    """The unioned strap outline ``straps`` extruded from the groove floor to THICK."""
+    floor = p["THICK"] - p["RECESS"] - p["EMBEDDING"]
+    return extrude_faces(straps, floor, p["RECESS"] + p["EMBEDDING"])
+
+
+def base_tile(p, outline, straps):
+    """
+    The base tile for ``outline`` with the groove for ``straps`` in its top:
+    a slab up to the groove floor with "outline minus straps" stacked on
+    it.  The two only touch on one plane, so gluing them is cheap compared
+    to cutting the strap solid out of the tile.
+    """
+    floor = p["THICK"] - p["RECESS"] - p["EMBEDDING"]
+    tile_face = polygon_face(outline)
+    if p["EMBEDDING"] <= 0:
+        return tile_face.extrude(Base.Vector(0, 0, p["THICK"] - p["RECESS"]))
+    slab = tile_face.extrude(Base.Vector(0, 0, floor))
+    ring = extrude_faces(_ring_cut(tile_face, straps), floor, p["EMBEDDING"])
+    return refine(_tile_fuse(slab, ring))
+
+
+def mold_cavity(p, outline, straps):
+    """
+    The mold cavity as a list of solids: the tile outline up to the tile
+    top and the strap outline from there to THICK.  This is exactly tile ∪
+    filigree, but the two only touch on one plane, so the mold can be cut
+    with both at once without fusing them first.
+    """
+    top = p["THICK"] - p["RECESS"]
+    cavity = [polygon_face(outline).extrude(Base.Vector(0, 0, top))]
+    if p["RECESS"] > 0:
+        cavity += extrude_faces(straps, top, p["RECESS"]).Solids
+    return cavity
+
+
+@instrument.timed("ring_cut")
+def _ring_cut(tile_face, straps):
+    return tile_face.cut(straps)
+
+
+@instrument.timed("tile_fuse")
+def _tile_fuse(slab, ring):
+    return slab.fuse(ring)
+
+
+# ─── Profiles as plain data ────────────────────────────────────────────────────
+
+def face_rings(region):
+    """
+    The faces of a planar ``region`` as ``[(outer, [holes...]), ...]`` with
+    every ring a list of (x, y) points.  No tessellation is involved.
+    """
+    def ring(wire):
+        return [(v.X, v.Y) for v in wire.OrderedVertexes]
+
+    polygons = []
+    for face in region.Faces:
+        outer = face.OuterWire
+        holes = [ring(w) for w in face.Wires if not w.isSame(outer)]
+        polygons.append((ring(outer), holes))
+    return polygons
+
+
+def profiles(p, outline, wedge, symmetry):
+    """
+    The 2D profiles every part of a tile is extruded from:
+
+    ``"outline"``  the tile outline, a list of (x, y) points
+    ``"straps"``   the unioned filigree outline, as ``face_rings`` data
+    ``"ring"``     the tile outline minus the straps, as ``face_rings`` data
+    """
+    straps = strap_region(p, wedge, symmetry)
+    return {
+        "outline": list(outline),
+        "straps":  face_rings(straps),
+        "ring":    face_rings(_ring_cut(polygon_face(outline), straps)),
+    }
@@ -0,0 +1,36 @@
+import pytest
+
+import batch
+
+
+def test_expand_sweeps_every_combination():
+    jobs = batch.expand({"tiles": ["tabl", "pange"], "sweep": {"side": [40, 50], "WIDTH": [5, 6]},
+                         "scale": [1.0, 1.1]})
+    assert len(jobs) == 2 * 2 * 2 * 2
+    labels = {job["label"] for job in jobs if job["name"] == "tabl"}
+    assert "WIDTH-5_side-40_scale-1.1" in labels and len(labels) == 8
+
+
+def test_expand_defaults():
+    jobs = batch.expand({})
+    assert [job["name"] for job in jobs] == list(batch.TILES)
+    job = jobs[0]
+    assert job["label"] == "default" and job["params"] == {} and job["scale"] == 1.0
+    assert job["formats"] == ["brep", "stl"] and job["outputs"] == list(batch.OUTPUTS)
+
+
+def test_expand_scales_lengths_only():
+    job, = batch.expand({"tiles": ["torange"], "units": "inch",
+                         "params": {"side": 2, "THICK": 0.3, "ANG": 30, "LINE_COLOR": [1, 2, 3]}})
+    assert job["params"]["side"] == pytest.approx(50.8)
+    assert job["params"]["THICK"] == pytest.approx(7.62)
+    assert job["params"]["ANG"] == 30 and job["params"]["LINE_COLOR"] == [1, 2, 3]
+    assert set(batch.LENGTH_KEYS) <= set(batch.PARAMS)
+
+
+@pytest.mark.parametrize("spec", [
+    {"tiles": ["hexagon"]}, {"formats": ["obj"]}, {"outputs": ["lid"]},
+])
+def test_expand_rejects_unknown_values(spec):
+    with pytest.raises(ValueError):
+        batch.expand(spec)
@@ -0,0 +1,80 @@
+from collections import Counter
+
+import pytest
+
+import meshwriter
+
+P = {"THICK": 7.62, "RECESS": 1.27, "EMBEDDING": 1.27, "MOLD_BUFFER": 6.35}
+
+SQUARE = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0)]
+
+
+def _box(x0, y0, x1, y1):
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+
+# A strap band right across the tile, and a square frame of strap around an
+# island of tile (a hole in the straps)
+PROFILES = {
+    "band": {"outline": SQUARE,
+             "straps": [(_box(0, 4, 10, 6), [])],
+             "ring": [(_box(0, 0, 10, 4), []), (_box(0, 6, 10, 10), [])]},
+    "frame": {"outline": SQUARE,
+              "straps": [(_box(2, 2, 8, 8), [_box(4, 4, 6, 6)[::-1]])],
+              "ring": [(SQUARE, [_box(2, 2, 8, 8)[::-1]]), (_box(4, 4, 6, 6), [])]},
+}
+for prof in PROFILES.values():
+    prof["mold"] = _box(-5, -5, 15, 15)
+
+
+def _area(region):
+    return sum(abs(meshwriter.signed_area(outer)) - sum(abs(meshwriter.signed_area(h))
+                                                        for h in holes)
+               for outer, holes in region) / 2
+
+
+def _volume(triangles):
+    return sum(a[0] * (b[1]*c[2] - b[2]*c[1]) + a[1] * (b[2]*c[0] - b[0]*c[2])
+               + a[2] * (b[0]*c[1] - b[1]*c[0]) for a, b, c in triangles) / 6
+
+
+def _assert_watertight(triangles):
+    """Every directed edge is matched by the same edge the other way round."""
+    key = lambda pt: tuple(round(v, 6) for v in pt)          # noqa: E731
+    edges = Counter((key(a), key(b)) for tri in triangles
+                    for a, b in zip(tri, tri[1:] + tri[:1]))
+    assert all(edges[(b, a)] == n for (a, b), n in edges.items())
+
+
+@pytest.mark.parametrize("kind", PROFILES)
+def test_tile(kind):
+    prof = PROFILES[kind]
+    tris = meshwriter.tile_triangles(P, prof)
+    _assert_watertight(tris)
+    floor = P["THICK"] - P["RECESS"] - P["EMBEDDING"]
+    expected = 100 * floor + _area(prof["ring"]) * P["EMBEDDING"]
+    assert _volume(tris) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("kind", PROFILES)
+def test_filigree(kind):
+    prof = PROFILES[kind]
+    tris = meshwriter.filigree_triangles(P, prof)
+    _assert_watertight(tris)
+    assert _volume(tris) == pytest.approx(_area(prof["straps"]) * (P["RECESS"] + P["EMBEDDING"]))
+
+
+@pytest.mark.parametrize("kind", PROFILES)
+def test_mold(kind):
+    prof = PROFILES[kind]
+    tris = meshwriter.mold_triangles(P, prof)
+    _assert_watertight(tris)
+    cavity = 100 * (P["THICK"] - P["RECESS"]) + _area(prof["straps"]) * P["RECESS"]
+    assert _volume(tris) == pytest.approx(400 * (P["THICK"] + P["MOLD_BUFFER"]) - cavity)
+
+
+def test_stl_round_trip(tmp_path):
+    tris = meshwriter.filigree_triangles(P, PROFILES["band"])
+    path = tmp_path / "filigree.stl"
+    meshwriter.write_stl(str(path), tris)
+    assert path.stat().st_size == 84 + 50 * len(tris)
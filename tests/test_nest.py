@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import kernel
+import nest
+
+SIDE = 50.8
+OUTLINES = {name: [tuple(pt) for pt in kernel.outline(name, SIDE)]
+            for name in ("tabl", "pange", "torange", "sheshband", "sormehdan")}
+
+
+def _placed(plate):
+    for name, x, y, rotation in plate:
+        yield nest._rotated(OUTLINES[name], rotation) + (x, y)
+
+
+def _inside(points, ring):
+    """Even-odd test of every point against ``ring``."""
+    a, b = ring, np.roll(ring, -1, axis=0)
+    px, py = points[:, None, 0], points[:, None, 1]
+    crosses = (a[:, 1] > py) != (b[:, 1] > py)
+    x = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / np.where(crosses, b[:, 1] - a[:, 1], 1)
+    return (crosses & (px < x)).sum(axis=1) % 2 == 1
+
+
+def _distance(points, ring):
+    """Smallest distance from ``points`` to the edges of ``ring``."""
+    a, b = ring, np.roll(ring, -1, axis=0)
+    d = b - a
+    t = np.clip(((points[:, None] - a) * d).sum(-1) / (d * d).sum(-1), 0, 1)
+    return np.linalg.norm(points[:, None] - (a + t[..., None] * d), axis=-1).min()
+
+
+def _dense(ring, n=16):
+    """Points along every edge of ``ring``."""
+    t = np.linspace(0, 1, n, endpoint=False)[:, None, None]
+    return (ring + t * (np.roll(ring, -1, axis=0) - ring)).reshape(-1, 2)
+
+
+@pytest.mark.parametrize("gap", [1.0, 3.0])
+def test_parts_keep_apart_and_on_the_bed(gap):
+    counts = {"tabl": 3, "pange": 6, "torange": 8, "sheshband": 5, "sormehdan": 5}
+    bed = (256.0, 256.0)
+    plates = nest.nest(counts, OUTLINES, bed=bed, gap=gap)
+    found = {}
+    for plate in plates:
+        for name, *_ in plate:
+            found[name] = found.get(name, 0) + 1
+        parts = list(_placed(plate))
+        for k, ring in enumerate(parts):
+            assert ring.min() > -1e-6 and (ring <= np.array(bed) + 1e-6).all()
+            for other in parts[k + 1:]:
+                assert not _inside(_dense(ring), other).any()
+                assert not _inside(_dense(other), ring).any()
+                apart = min(_distance(ring, other), _distance(other, ring))
+                assert apart >= gap - nest.RESOLUTION / nest.SUBSAMPLES
+    assert found == counts
+
+
+def test_too_big_for_the_bed():
+    with pytest.raises(ValueError):
+        nest.nest({"tabl": 1}, OUTLINES, bed=(60.0, 60.0))
@@ -0,0 +1,99 @@
+import io
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import service
+
+BUILD_SECONDS = 1.0
+
+
+def _ready():
+    pass
+
+
+def _stub_job(job, out_dir):
+    """Stands in for ``batch.run_job``: one file per job, slowly enough to coalesce."""
+    if job["name"] == "torange":
+        raise RuntimeError("stub refuses the torange")
+    time.sleep(BUILD_SECONDS)
+    directory = os.path.join(out_dir, job["name"], job["label"])
+    os.makedirs(directory)
+    path = os.path.join(directory, "tile.txt")
+    with open(path, "w") as fh:
+        fh.write(json.dumps(job["params"]))
+    return {"name": job["name"], "label": job["label"], "directory": directory,
+            "files": [path], "status": "ok"}
+
+
+@pytest.fixture
+def url(tmp_path):
+    svc = service.Service(2, str(tmp_path), run_job=_stub_job, warm=_ready)
+    service.Handler.service = svc
+    server = ThreadingHTTPServer(("127.0.0.1", 0), service.Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    svc.close()
+
+
+def _status(url):
+    with urllib.request.urlopen(url + "/status") as response:
+        return json.loads(response.read())
+
+
+def test_round_trip(url):
+    data = service.request({"tile": "pange", "params": {"side": 60}}, url)
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert sorted(zf.namelist()) == ["result.json", "tile.txt"]
+        assert json.loads(zf.read("tile.txt")) == {"side": 60}
+    assert _status(url)["builds"] == 1
+
+
+def test_identical_requests_share_a_build(url):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.request({"tile": "tabl"}, url)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 3 and len(set(results)) == 1
+    status = _status(url)
+    assert status["builds"] == 1 and status["coalesced"] == 2
+
+
+@pytest.mark.parametrize("req", [
+    {"tile": "hexagon"},
+    {"tile": "pange", "scale": None},
+    {"tile": "pange", "scale": [1, 2]},
+    {"tile": "pange", "params": {"SIDE": 60}},
+    {"tile": "pange", "params": [60]},
+    {"tile": "pange", "params": {"side": "big"}},
+    {"tile": "pange", "units": "furlong"},
+    {"tile": "pange", "formats": "stl"},
+    {"tile": "pange", "outputs": "tile"},
+    {"tile": "pange", "colour": "red"},
+    ["pange"],
+])
+def test_bad_request(url, req):
+    with pytest.raises(urllib.error.HTTPError) as err:
+        service.request(req, url)
+    assert err.value.code == 400
+    assert json.loads(err.value.read())["error"]
+
+
+def test_build_error_is_a_500(url):
+    with pytest.raises(urllib.error.HTTPError) as err:
+        service.request({"tile": "torange"}, url)
+    assert err.value.code == 500
+    assert "stub refuses" in json.loads(err.value.read())["error"]
@@ -0,0 +1,129 @@
+import os
+import sys
+import types
+
+import pytest
+
+import shapecache
+
+P = {"side": 50.8, "THICK": 7.62, "RECESS": 1.27, "EMBEDDING": 1.27, "WIDTH": 6.35,
+     "MOLD_BUFFER": 6.35, "ANG": 36.0, "LINE_COLOR": (171, 133, 70), "TILE_COLOR": (94, 140, 125)}
+
+
+class Shape:
+    """Stands in for a ``Part.Shape``: BREP files hold its label."""
+
+    def __init__(self, label):
+        self.label = label
+
+    def exportBrep(self, path):
+        with open(path, "w") as fh:
+            fh.write(self.label)
+
+
+def _read(path):
+    with open(path) as fh:
+        return fh.read()
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    monkeypatch.setitem(sys.modules, "Part", types.SimpleNamespace(read=_read))
+    monkeypatch.setattr(shapecache, "STATS", dict.fromkeys(shapecache.STATS, 0))
+    return shapecache.STATS
+
+
+def _build(calls):
+    def build(name, p, parts):
+        calls.append(tuple(parts))
+        return tuple(Shape(part.lower()) if part in parts else None for part in shapecache.PARTS)
+    return build
+
+
+def _labels(shapes):
+    """Built shapes and loaded ones (BREP text) compared alike."""
+    return tuple(getattr(shape, "label", shape) for shape in shapes)
+
+
+# ─── Keys ──────────────────────────────────────────────────────────────────────
+
+def test_key_ignores_order_number_type_and_colors():
+    reordered = dict(reversed(list(P.items())))
+    as_ints = dict(P, ANG=36, side=50.8)
+    recolored = dict(P, LINE_COLOR=(0, 0, 0))
+    digest = shapecache.key("pange", P, "1")
+    assert {shapecache.key("pange", q, "1") for q in (reordered, as_ints, recolored)} == {digest}
+
+
+@pytest.mark.parametrize("change", [
+    {"name": "torange"}, {"version": "2"}, {"engine": "3d"}, {"side": 50.9}, {"ANG": 30.0},
+])
+def test_key_changes_with_geometry(change):
+    name = change.pop("name", "pange")
+    version = change.pop("version", "1")
+    engine = change.pop("engine", "")
+    digest = shapecache.key(name, dict(P, **change), version, engine)
+    assert digest != shapecache.key("pange", P, "1")
+
+
+# ─── Cached builds ─────────────────────────────────────────────────────────────
+
+def test_miss_then_hit(tmp_path, stats):
+    calls = []
+    first = shapecache.cached("pange", P, _build(calls), "1", root=str(tmp_path))
+    again = shapecache.cached("pange", P, _build(calls), "1", root=str(tmp_path))
+    assert _labels(first) == ("basetile", "filigree", "moldwithcavity") == _labels(again)
+    assert calls == [shapecache.PARTS]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+def test_partial_parts(tmp_path, stats):
+    calls, root = [], str(tmp_path)
+    tile = ("BaseTile",)
+    both = ("BaseTile", "Filigree")
+    assert _labels(shapecache.cached("tabl", P, _build(calls), "1", root=root, parts=tile)) == \
+        ("basetile", None, None)
+    assert _labels(shapecache.cached("tabl", P, _build(calls), "1", root=root, parts=tile)) == \
+        ("basetile", None, None)
+    assert _labels(shapecache.cached("tabl", P, _build(calls), "1", root=root, parts=both)) == \
+        ("basetile", "filigree", None)
+    assert _labels(shapecache.cached("tabl", P, _build(calls), "1", root=root, parts=both)) == \
+        ("basetile", "filigree", None)
+    assert calls == [tile, both]
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert len(shapecache.entries(root)) == 1          # the filigree joined the entry
+
+
+# ─── Eviction ──────────────────────────────────────────────────────────────────
+
+def _entry(root, digest, size, mtime):
+    directory = shapecache.entry_dir(digest, root)
+    os.makedirs(directory)
+    with open(os.path.join(directory, "BaseTile.brep"), "wb") as fh:
+        fh.write(b"x" * size)
+    os.utime(directory, (mtime, mtime))
+    return directory
+
+
+def test_evict_least_recently_used(tmp_path, stats):
+    root = str(tmp_path)
+    mb = 1024 * 1024
+    old, used, new = (_entry(root, digest * 64, mb, mtime)
+                      for digest, mtime in (("a", 1000), ("b", 2000), ("c", 3000)))
+    os.utime(used, (4000, 4000))                       # used most recently
+    shapecache.evict(limit_mb=2.5, root=root)
+    assert [d for _, _, d in shapecache.entries(root)] == [new, used]
+    shapecache.evict(limit_mb=1, root=root)
+    assert [d for _, _, d in shapecache.entries(root)] == [used]
+    assert not os.path.exists(old) and stats["evictions"] == 2
+
+
+def test_load_marks_the_entry_used(tmp_path):
+    root = str(tmp_path)
+    digest = shapecache.key("pange", P, "1")
+    shapecache.store(digest, (Shape("tile"), None, None), root=root)
+    directory = shapecache.entry_dir(digest, root)
+    os.utime(directory, (1000, 1000))
+    assert shapecache.load(digest, root, parts=("BaseTile",)) == ("tile", None, None)
+    assert os.stat(directory).st_mtime > 1000
+    assert shapecache.load(digest, root) is None       # filigree and mold missing
@@ -0,0 +1,49 @@
+import pytest
+
+import stitch
+
+
+def _run(fn, *args):
+    return list(map(fn, *args))
+
+
+def _merge(a, b):
+    """Stands in for ``stitch.merge_regions``: regions are sets of cells."""
+    assert not a & b
+    return a | b
+
+
+def _stitched(keys):
+    regions = {key: frozenset([key]) for key in keys}
+    axis = rounds = 0
+    while len(regions) > 1:
+        regions = stitch._stitch_round(regions, axis, _run, _merge)
+        axis, rounds = 1 - axis, rounds + 1
+    region, = regions.values()
+    return region, rounds
+
+
+@pytest.mark.parametrize("width, height", [(1, 1), (2, 1), (3, 5), (7, 4), (8, 8)])
+def test_stitch_equals_direct_fuse(width, height):
+    keys = [(i, j) for i in range(-2, width - 2) for j in range(3, height + 3)]
+    region, rounds = _stitched(keys)
+    assert region == frozenset(keys)
+    # each round halves the span along its axis
+    assert rounds <= 2 * max(width - 1, height - 1).bit_length()
+
+
+def test_stitch_with_empty_cells():
+    keys = [(i, j) for i in range(5) for j in range(5) if (i * j) % 3 != 1]
+    region, _ = _stitched(keys)
+    assert region == frozenset(keys)
+
+
+def test_merges_are_neighbours():
+    # Before the last round, no merged region spans more than half the grid
+    regions = {(i, j): frozenset([(i, j)]) for i in range(4) for j in range(4)}
+    for axis in (0, 1):
+        regions = stitch._stitch_round(regions, axis, _run, _merge)
+    assert len(regions) == 4
+    for region in regions.values():
+        xs, ys = {i for i, _ in region}, {j for _, j in region}
+        assert len(region) == 4 and max(xs) - min(xs) == 1 and max(ys) - min(ys) == 1
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import kernel
+import tiling
+import validate
+
+
+def _area(name):
+    x, y = tiling.OUTLINES[name].T
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+@pytest.mark.parametrize("name", tiling.GIRIH)
+def test_girih_rules_cover_the_parent(name):
+    # Children fill the parent scaled by the factor; the Shesh Bands across
+    # its edges are half inside.
+    children = tiling.GIRIH_RULES["rules"][name]
+    across = len(tiling.OUTLINES[name])
+    area = sum(_area(kind) for kind, *_ in children) - across * _area("sheshband") / 2
+    assert area == pytest.approx(tiling.GIRIH_RULES["factor"]**2 * _area(name))
+
+
+@pytest.mark.parametrize("name", tiling.GIRIH)
+def test_girih_inflation_is_edge_to_edge(name):
+    t = tiling.inflate(tiling.seed(name), steps=2)
+    assert set(tiling.counts(t)) <= set(tiling.GIRIH)
+    report = validate.validate_tiling(t)
+    assert report["ok"], validate.summary(report)
+    assert report["outlines"] == 1
+
+
+def test_straddling_children_are_merged():
+    t = tiling.inflate(tiling.seed("torange"))
+    assert tiling.counts(t) == {"torange": 6, "sheshband": 7, "sormehdan": 3}
+
+
+def test_penrose_thick_to_thin_ratio():
+    found = tiling.counts(tiling.inflate(tiling.seed("torange"), tiling.PENROSE, 10))
+    assert found["torange"] / found["thin"] == pytest.approx(kernel.PHI, rel=1e-2)
+
+
+def test_inflate_raises_without_a_rule():
+    with pytest.raises(KeyError, match="tabl"):
+        tiling.inflate(tiling.seed("tabl"), tiling.PENROSE)
+
+
+def test_layout_refuses_thin_rhombs():
+    t = tiling.inflate(tiling.seed("torange"), tiling.PENROSE, 3)
+    with pytest.raises(ValueError, match="thin"):
+        tiling.to_layout(t, 50.8)
+    layout = tiling.to_layout(t, 50.8, drop=True)
+    assert len(layout) == tiling.counts(t)["torange"]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import tiling
+import validate
+
+SIDE = 50.8
+
+
+def _pair(name, gap=0.0, turn=0.0):
+    """Two tiles ``name`` sharing an edge, pulled ``gap`` mm apart; the second turned by ``turn``."""
+    z = tiling.OUTLINES[name] @ np.array([1, 1j])
+    a, b = z[0], z[1]
+    mid = (a + b) / 2
+    normal = -1j * (b - a) / abs(b - a)
+    if np.dot([mid.real, mid.imag], [normal.real, normal.imag]) < 0:
+        normal = -normal                                   # outward
+    other = 2 * mid + normal * gap / SIDE                  # mirrored through the edge midpoint
+    return [(name, 0.0, 0.0, 0.0),
+            (name, other.real * SIDE, other.imag * SIDE, 180.0 + turn)]
+
+
+def test_known_good_layout():
+    layout = tiling.to_layout(tiling.inflate(tiling.seed("torange"), steps=2), SIDE)
+    report = validate.validate(layout, SIDE)
+    assert report["ok"], validate.summary(report)
+    assert report["outlines"] == 1
+
+
+@pytest.mark.parametrize("name", ["pange", "sheshband", "torange"])
+def test_shared_edge_is_ok(name):
+    assert validate.validate(_pair(name), SIDE)["ok"]
+
+
+@pytest.mark.parametrize("gap", [1.0, 5.0])
+def test_pulled_apart_is_mismatched(gap):
+    report = validate.validate(_pair("sheshband", gap), SIDE)
+    assert report["mismatched"] and not report["ok"]
+
+
+@pytest.mark.parametrize("depth", [0.5, 1.0])
+def test_pushed_together_overlaps(depth):
+    report = validate.validate(_pair("pange", -depth), SIDE)
+    assert report["overlaps"] and not report["ok"]
+
+
+def test_rotated_decagon_overlaps():
+    layout = [("tabl", 0.0, 0.0, 0.0), ("tabl", 0.0, 0.0, 18.0)]
+    report = validate.validate(layout, SIDE)
+    assert [tiles for tiles, _, _ in report["overlaps"]] == [(0, 1)]
+
+
+def test_tile_lying_across_a_patch():
+    layout = tiling.to_layout(tiling.inflate(tiling.seed("sormehdan")), SIDE)
+    layout.append(("torange", 0.3 * SIDE, 0.2 * SIDE, 9.0))
+    report = validate.validate(layout, SIDE)
+    assert any(len(layout) - 1 in tiles for tiles, _, _ in report["overlaps"])
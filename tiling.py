@@ -0,0 +1,280 @@
+"""
+Aperiodic tilings by substitution, as NumPy arrays.
+
+A tiling is a structured array of placements ``(type, x, y, angle)``: an
+index into ``TYPES``, the position of the tile's origin in units of the
+tile side, and its rotation in degrees.  A tile's own frame is the one
+``girih.LAYOUTS`` builds it in, so a placement is exactly what
+``patch.assemble`` needs once the position is scaled to the side in mm.
+
+One ``inflate`` step scales the plane by the rule set's factor and
+replaces every tile by its children, one type at a time over the whole
+array; tiles that straddle two parents come out of both and are merged.
+Nothing here imports FreeCAD, so millions of placements take seconds.
+
+    import tiling
+    t = tiling.inflate(tiling.seed("tabl"), steps=4)
+    tiling.write_layout("panel.csv", t, side=50.8)
+
+``GIRIH_RULES`` (``girih_rules.json``) subdivide all five Girih tiles by
+φ² + 1 + 1: every parent edge becomes a side, the long axis of a Shesh
+Band straddling the edge, and another side, and the rest of the parent is
+filled with whole tiles.  ``PENROSE`` is Penrose's rhomb substitution; its
+thick rhomb is the Torange but the thin 36° rhomb, ``"thin"``, has no
+Girih tile, so ``to_layout`` refuses those unless told to drop them.
+Other rule sets can be given as a JSON file of the same shape (see
+``load_rules``).
+"""
+import argparse
+import cmath
+import csv
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+import kernel
+from kernel import PHI
+
+TYPES = ("tabl", "pange", "torange", "sheshband", "sormehdan", "thin")
+GIRIH = TYPES[:5]
+
+PLACEMENT = np.dtype([("type", "u1"), ("x", "f8"), ("y", "f8"), ("angle", "f8")])
+
+# Placements closer than this (in tile sides / degrees) are the same tile.
+QUANTUM = 1e-4
+ANGLE_QUANTUM = 1e-3
+
+
+# ─── Tile frames ───────────────────────────────────────────────────────────────
+
+# Unit-side outline of every type in its own frame, as (N, 2) arrays.
+OUTLINES = dict({name: kernel.outline(name) for name in GIRIH},
+                thin=kernel.walk(1.0, [36, 144] * 2, 162))
+
+
+def _complex(points):
+    return [complex(x, y) for x, y in points]
+
+
+# Each rhomb is a pair of Robinson triangles (A, B, C) and (A', B, C),
+# mirror images across the diagonal BC.
+_THICK = _complex(OUTLINES["torange"])
+_THIN = _complex(OUTLINES["thin"])
+_TRIANGLES = {                             # type: (robinson, A, B, C, A')
+    "torange": (1, _THICK[0], _THICK[1], _THICK[3], _THICK[2]),
+    "thin":    (0, _THIN[1], _THIN[2], _THIN[0], _THIN[3]),
+}
+_ROBINSON = {robinson: name for name, (robinson, *_) in _TRIANGLES.items()}
+
+
+def _subdivide(robinson, A, B, C):
+    """Robinson triangles of one triangle, at 1/PHI the size."""
+    if robinson == 0:                      # acute: 36° at A
+        P = A + (B - A) / PHI
+        return [(0, C, P, B), (1, P, C, A)]
+    Q = B + (A - B) / PHI                  # obtuse: 108° at A
+    R = B + (C - B) / PHI
+    return [(1, R, C, A), (1, Q, R, B), (0, R, Q, A)]
+
+
+def _placement(robinson, A, B, C):
+    """``(type, position, angle)`` of the rhomb on triangle (A, B, C)."""
+    name = _ROBINSON[robinson]
+    _, A0, B0, _, A0_ = _TRIANGLES[name]
+    centre = (B + C) / 2
+    for anchor in (A0, A0_):               # either half of the rhomb
+        turn = (A - centre) / anchor
+        if abs(turn * B0 + centre - B) < 1e-9:
+            return name, centre, math.degrees(cmath.phase(turn))
+    raise ValueError("triangle is not a rhomb half")
+
+
+def _penrose():
+    rules = {}
+    for name, (robinson, A, B, C, A_) in _TRIANGLES.items():
+        children = []
+        for a in (A, A_):
+            for child in _subdivide(robinson, a * PHI, B * PHI, C * PHI):
+                kind, centre, angle = _placement(*child)
+                entry = [kind, round(centre.real, 12), round(centre.imag, 12),
+                         round(angle, 9) % 360]
+                if entry not in children:
+                    children.append(entry)
+        rules[name] = children
+    return {"factor": PHI, "rules": rules}
+
+
+# Penrose rhomb (P3) substitution: {"factor": f, "rules": {type: [[child
+# type, x, y, angle], ...]}}, children in the parent's frame scaled by f.
+# A rule set may add "period": {type: degrees} when its rules look the same
+# after turning a parent by that much; children that straddle two parents
+# then merge even if the two give them turns that differ by the period.
+PENROSE = _penrose()
+
+
+def load_rules(path):
+    """A rule set from a JSON file laid out like ``PENROSE``."""
+    with open(path) as fh:
+        rules = json.load(fh)
+    unknown = set(rules["rules"]) | {c[0] for cs in rules["rules"].values() for c in cs}
+    unknown |= set(rules.get("period", ()))
+    unknown -= set(TYPES)
+    if unknown:
+        raise KeyError("Unknown tile type(s): %s" % ", ".join(sorted(unknown)))
+    return rules
+
+
+# Girih subdivision by φ² + 2, all five tiles; the Shesh Bands on the
+# parent edges come out of both parents and are merged.
+GIRIH_RULES = load_rules(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                      "girih_rules.json"))
+RULES = {"girih": GIRIH_RULES, "penrose": PENROSE}
+
+
+# ─── Tilings ───────────────────────────────────────────────────────────────────
+
+def tiles(types, x, y, angle):
+    """A tiling from parallel sequences; ``types`` by name or index."""
+    t = np.empty(len(x), dtype=PLACEMENT)
+    t["type"] = [TYPES.index(k) if isinstance(k, str) else k for k in types]
+    t["x"], t["y"], t["angle"] = x, y, angle
+    return t
+
+
+def seed(name="torange"):
+    """A single tile at the origin."""
+    return tiles([name], [0.0], [0.0], [0.0])
+
+
+def merge(t, period=360.0):
+    """
+    ``t`` with duplicate placements dropped, in a stable order.  Angles are
+    compared, and come out, modulo ``period`` (degrees, or one per type).
+    """
+    t = t.copy()
+    t["angle"] %= np.broadcast_to(period, (len(TYPES),))[t["type"]]
+    keys = (np.rint(t["angle"] / ANGLE_QUANTUM).astype("i8") % round(360 / ANGLE_QUANTUM),
+            np.rint(t["y"] / QUANTUM).astype("i8"),
+            np.rint(t["x"] / QUANTUM).astype("i8"),
+            t["type"])
+    order = np.lexsort(keys)
+    same = np.ones(max(len(t) - 1, 0), dtype=bool)
+    for k in keys:
+        k = k[order]
+        same &= k[1:] == k[:-1]
+    first = np.concatenate(([True], ~same))[:len(t)]
+    return t[np.sort(order[first])]
+
+
+def inflate(t, rules=GIRIH_RULES, steps=1):
+    """
+    Apply ``rules`` to every tile of ``t``, ``steps`` times.  The result is
+    in the same units (one tile side), so it covers ``factor**(2*steps)``
+    times the area of ``t``.  Raises KeyError if ``t`` holds a type the
+    rules have no substitution for.
+    """
+    factor = rules["factor"]
+    period = np.array([rules.get("period", {}).get(name, 360.0) for name in TYPES])
+    table = {TYPES.index(name): (np.array([TYPES.index(c[0]) for c in children], "u1"),
+                                 np.array([complex(c[1], c[2]) for c in children]),
+                                 np.array([c[3] for c in children], "f8"))
+             for name, children in rules["rules"].items()}
+    for _ in range(steps):
+        missing = set(np.unique(t["type"]).tolist()) - set(table)
+        if missing:
+            raise KeyError("No substitution rule for: %s"
+                           % ", ".join(TYPES[k] for k in sorted(missing)))
+        out = []
+        for code, (kinds, offsets, turns) in table.items():
+            parents = t[t["type"] == code]
+            if not len(parents):
+                continue
+            origin = factor * (parents["x"] + 1j*parents["y"])
+            rotation = np.exp(1j * np.radians(parents["angle"]))
+            where = origin[:, None] + rotation[:, None] * offsets[None, :]
+            children = np.empty(where.shape, dtype=PLACEMENT)
+            children["type"] = kinds[None, :]
+            children["x"], children["y"] = where.real, where.imag
+            children["angle"] = parents["angle"][:, None] + turns[None, :]
+            out.append(children.ravel())
+        t = merge(np.concatenate(out), period) if out else t[:0]
+    return t
+
+
+def counts(t):
+    """``{type: number of tiles}``."""
+    found = np.bincount(t["type"], minlength=len(TYPES))
+    return {name: int(n) for name, n in zip(TYPES, found) if n}
+
+
+# ─── Downstream ────────────────────────────────────────────────────────────────
+
+def to_layout(t, side, drop=False):
+    """
+    ``[(tile, x, y, rotation), ...]`` for ``patch.assemble``, positions in
+    mm for tiles of ``side`` mm.  Types without a Girih tile would leave
+    holes, so they raise ValueError unless ``drop`` is set.
+    """
+    girih = t["type"] < len(GIRIH)
+    if not drop and not girih.all():
+        raise ValueError("No Girih tile for %s; pass drop=True to leave them out"
+                         % ", ".join("%d %s" % (n, k) for k, n in counts(t[~girih]).items()))
+    keep = t[girih]
+    return list(zip((TYPES[k] for k in keep["type"].tolist()),
+                    (keep["x"] * side).tolist(), (keep["y"] * side).tolist(),
+                    keep["angle"].tolist()))
+
+
+def write_layout(path, t, side, drop=False):
+    """Write ``to_layout(t, side, drop)`` as a CSV file ``patch.read_layout`` reads."""
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(("tile", "x", "y", "rotation"))
+        writer.writerows((name, "%.6f" % x, "%.6f" % y, "%.6f" % rot)
+                         for name, x, y, rot in to_layout(t, side, drop))
+
+
+def read_layout(path):
+    """
+    Read a layout from a CSV file with columns ``tile,x,y,rotation`` (header
+    optional) or a JSON list of ``[tile, x, y, rotation]`` entries.
+    """
+    with open(path) as fh:
+        if path.lower().endswith(".json"):
+            rows = json.load(fh)
+        else:
+            rows = [row for row in csv.reader(fh) if row and not row[0].startswith("#")]
+            if rows and rows[0][0].strip().lower() == "tile":
+                rows = rows[1:]
+    return [(str(r[0]).strip(), float(r[1]), float(r[2]), float(r[3]) if len(r) > 3 else 0.0)
+            for r in rows]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Grow an aperiodic tiling by substitution.")
+    ap.add_argument("-n", "--steps", type=int, default=3, help="inflation steps")
+    ap.add_argument("--seed", default="tabl", choices=TYPES, help="starting tile")
+    ap.add_argument("--rules", default="girih",
+                    help="'girih', 'penrose' or a JSON rule set (default: girih)")
+    ap.add_argument("--drop", action="store_true",
+                    help="leave out tiles without a Girih tile (Penrose thin rhombs)")
+    ap.add_argument("--side", type=float, default=50.8, help="tile side in mm")
+    ap.add_argument("-o", "--out", default="layout.csv", help="layout CSV to write")
+    args = ap.parse_args(argv)
+
+    rules = RULES.get(args.rules) or load_rules(args.rules)
+    try:
+        t = inflate(seed(args.seed), rules, args.steps)
+        write_layout(args.out, t, args.side, args.drop)
+    except (KeyError, ValueError) as exc:
+        ap.error(exc.args[0])
+    sys.stderr.write("%s → %s\n" % (", ".join("%d %s" % (n, k) for k, n in counts(t).items()),
+                                    args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
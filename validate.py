@@ -0,0 +1,324 @@
+"""
+Edge-matching check for assembled tilings, before any CAD time is spent.
+
+A panel is valid when its tiles meet edge to edge: every edge inside it is
+shared by exactly two tiles, with the same length and direction and one
+tile on each side.  Every Girih tile's strapwork crosses each of its edges
+at the midpoint at the same ``ANG`` crossing, so matched edges mean
+matched lines as well.
+
+Edge midpoints go into a grid hash with cells ``tolerance`` wide, and each
+midpoint looks for partners in its own and the eight neighbouring cells
+only.  The corners are hashed the same way, and the tile angles around a
+corner may not add up to more than 360°.
+Unshared edges whose midpoints are within ``NEAR_MISS`` of each other are
+neighbours pulled apart or pushed together.  For overlaps, the tiles are
+split into convex pieces (only the Sormeh Dan needs two) and the pieces
+hashed by centre; every pair close enough to touch gets a separating-axis
+test, and overlaps deeper than ``tolerance`` are reported; 100k tiles take
+about 3.5 seconds.  The report lists
+
+    mismatched  edges meeting at their midpoints at another angle or length,
+                and unshared edges with midpoints less than NEAR_MISS apart
+    overlaps    edges claimed twice from the same side or by three or more
+                tiles, corners with more than 360° of tile around them, and
+                tiles lying across each other
+    gaps        holes in the panel: closed runs of unshared edges enclosing
+                no tile (the runs around the outside are its outlines)
+
+    import validate
+    report = validate.validate(patch.read_layout("panel.csv"), side=50.8)
+    print(validate.summary(report))
+
+Positions are in the units of ``side`` (mm for a layout) throughout.  It
+needs NumPy only, not FreeCAD.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+import tiling
+
+TOLERANCE = 1e-3                # points closer than this, in tile sides, coincide
+ANGLE_TOLERANCE = 1e-3          # degrees
+NEAR_MISS = 0.25                # unshared edge midpoints this close (tile sides) should meet
+SAT_CHUNK = 4096                # piece pairs per separating-axis batch
+
+
+# ─── Outlines ──────────────────────────────────────────────────────────────────
+
+def _unit_outlines(names):
+    """``{tile: (corners, interior angles)}``, unit side, counterclockwise."""
+    found = {}
+    for name in names:
+        if name not in tiling.OUTLINES:
+            raise KeyError("Unknown tile %r, expected one of %s"
+                           % (name, ", ".join(tiling.OUTLINES)))
+        z = tiling.OUTLINES[name] @ np.array([1, 1j])
+        if np.sum((z.conj() * np.roll(z, -1)).imag) < 0:
+            z = z[::-1]
+        ahead, back = np.roll(z, -1) - z, np.roll(z, 1) - z
+        found[name] = (z, np.degrees(np.angle(back / ahead)) % 360)
+    return found
+
+
+def _convex_pieces(z, angles):
+    """``z`` as convex polygons, cut between its reflex corners (at most two)."""
+    reflex = np.flatnonzero(angles > 180 + ANGLE_TOLERANCE)
+    if not len(reflex):
+        return [z]
+    if len(reflex) != 2:
+        raise ValueError("Cannot split an outline with %d reflex corners" % len(reflex))
+    a, b = reflex
+    return [z[a:b + 1], np.concatenate([z[b:], z[:a + 1]])]
+
+
+# ─── Grid hash ─────────────────────────────────────────────────────────────────
+
+def _pairs(z, tol):
+    """Index pairs ``(i, j)``, i < j, of the points ``z`` closer than ``tol``."""
+    cx = np.floor(z.real / tol).astype(np.int64)
+    cy = np.floor(z.imag / tol).astype(np.int64)
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+    stride = int(cy.max()) + 2
+    cell = cx * stride + cy
+    order = np.argsort(cell, kind="stable")
+    cells = cell[order]
+
+    # Each point's own cell and four of its neighbours; the other four see
+    # it from their side.  The lookups come sorted, which keeps them fast.
+    found_i, found_j = [], []
+    for offset in (0, 1, stride - 1, stride, stride + 1):
+        lo = np.searchsorted(cells, cells + offset, "left")
+        n = np.searchsorted(cells, cells + offset, "right") - lo
+        i = np.repeat(order, n)
+        j = order[np.repeat(lo - np.cumsum(n) + n, n) + np.arange(n.sum())]
+        if offset == 0:
+            i, j = i[i < j], j[i < j]
+        found_i.append(i)
+        found_j.append(j)
+    i, j = np.concatenate(found_i), np.concatenate(found_j)
+    keep = np.abs(z[i] - z[j]) < tol
+    return np.minimum(i[keep], j[keep]), np.maximum(i[keep], j[keep])
+
+
+def _components(n, i, j):
+    """A label per node of the graph on ``n`` nodes with edges ``(i, j)``."""
+    label = np.arange(n)
+    while True:
+        a, b = label[i], label[j]
+        differ = a != b
+        if not differ.any():
+            return label
+        np.minimum.at(label, np.maximum(a[differ], b[differ]), np.minimum(a[differ], b[differ]))
+        while True:                                 # point every node at its root
+            root = label[label]
+            if np.array_equal(root, label):
+                break
+            label = root
+
+
+def _groups(labels, members):
+    """``members`` (indices) split into arrays by their ``labels``."""
+    members = members[np.argsort(labels[members], kind="stable")]
+    return np.split(members, np.flatnonzero(np.diff(labels[members])) + 1) if len(members) else []
+
+
+def _overlapping(names, types, centre, angle, outlines, tolerance):
+    """
+    Pairs of tiles ``(a, b, where)`` whose convex pieces overlap by more
+    than ``tolerance``: no edge normal of either piece separates them.
+    Pieces are kept per shape, so each batch is one shape against another.
+    """
+    shapes, owner, kind, local = [], [], [], []
+    for code in np.unique(types):
+        idx = np.flatnonzero(types == code)
+        turn = np.exp(1j * np.radians(angle[idx]))[:, None]
+        for piece in _convex_pieces(*outlines[names[code]]):
+            pts = centre[idx][:, None] + turn * piece[None, :]
+            normal = -1j * (np.roll(pts, -1, axis=1) - pts)
+            shapes.append((pts, normal / np.abs(normal)))
+            owner.append(idx)
+            kind.append(np.full(len(idx), len(shapes) - 1))
+            local.append(np.arange(len(idx)))
+    owner, kind, local = np.concatenate(owner), np.concatenate(kind), np.concatenate(local)
+    mid = np.concatenate([pts.mean(axis=1) for pts, _ in shapes])
+    reach = np.concatenate([np.abs(pts - pts.mean(axis=1)[:, None]).max(axis=1)
+                            for pts, _ in shapes])
+
+    i, j = _pairs(mid, 2 * reach.max())
+    keep = (owner[i] != owner[j]) & (np.abs(mid[i] - mid[j]) < reach[i] + reach[j] - tolerance)
+    i, j = i[keep], j[keep]
+    order = np.lexsort((kind[j], kind[i]))
+    i, j = i[order], j[order]
+    batch = np.flatnonzero(np.diff(kind[i]) | np.diff(kind[j])) + 1
+    for first, last in zip(np.r_[0, batch], np.r_[batch, len(i)]):
+        for lo in range(first, last, SAT_CHUNK):
+            a, b = i[lo:min(lo + SAT_CHUNK, last)], j[lo:min(lo + SAT_CHUNK, last)]
+            pa, na = shapes[kind[a[0]]]
+            pb, nb = shapes[kind[b[0]]]
+            pa, pb = pa[local[a]], pb[local[b]]
+            axes = np.concatenate([na[local[a]], nb[local[b]]], axis=1)[:, :, None]
+            ra = (axes.conj() * pa[:, None, :]).real
+            rb = (axes.conj() * pb[:, None, :]).real
+            depth = np.minimum(ra.max(2), rb.max(2)) - np.maximum(ra.min(2), rb.min(2))
+            hit = depth.min(axis=1) > tolerance
+            yield from zip(owner[a[hit]], owner[b[hit]], (mid[a[hit]] + mid[b[hit]]) / 2)
+
+
+# ─── Checking ──────────────────────────────────────────────────────────────────
+
+def check(names, types, x, y, angle, side=1.0, tolerance=TOLERANCE):
+    """
+    Check the tiles ``names[types[k]]`` placed at ``(x[k], y[k])`` and turned
+    by ``angle[k]`` degrees, for tiles of ``side``.  Returns the report: a
+    dict of counts and the ``mismatched``, ``overlaps`` and ``gaps`` found,
+    each an entry ``(tiles, x, y)`` naming the tile indices involved.
+    """
+    report = {"tiles": len(types), "edges": 0, "shared": 0,
+              "mismatched": [], "overlaps": [], "gaps": [], "outlines": 0, "ok": True}
+    if not len(types):
+        return report
+    types = np.asarray(types)
+    x, y = np.asarray(x, float) / side, np.asarray(y, float) / side
+    angle = np.asarray(angle, float)
+    outlines = _unit_outlines(names[code] for code in np.unique(types))
+
+    # Every corner of every tile, each the start of the edge to the next one
+    corners, owner, inner, ahead = [], [], [], []
+    count = 0
+    for code in np.unique(types):
+        idx = np.flatnonzero(types == code)
+        z, angles = outlines[names[code]]
+        turn = np.exp(1j * np.radians(angle[idx]))[:, None]
+        corners.append(((x[idx] + 1j*y[idx])[:, None] + turn * z[None, :]).ravel())
+        owner.append(np.repeat(idx, len(z)))
+        inner.append(np.tile(angles, len(idx)))
+        local = np.arange(len(idx) * len(z)).reshape(len(idx), len(z)) + count
+        ahead.append(np.roll(local, -1, axis=1).ravel())
+        count += local.size
+    corners, owner = np.concatenate(corners), np.concatenate(owner)
+    inner, ahead = np.concatenate(inner), np.concatenate(ahead)
+    start, end = corners, corners[ahead]
+    mid, vec = (start + end) / 2, end - start
+
+    report["edges"] = len(mid)
+
+    def entry(tiles, where):
+        return (tuple(sorted(set(tiles.tolist()))), where.real * side, where.imag * side)
+
+    # Edges: partners by midpoint
+    i, j = _pairs(mid, tolerance)
+    group = _components(len(mid), i, j)
+    size = np.bincount(group, minlength=len(mid))[group]
+    pair = size[i] == 2
+    i, j = i[pair], j[pair]
+    opposite = np.abs(vec[i] + vec[j]) < tolerance
+    same = np.abs(vec[i] - vec[j]) < tolerance
+    report["shared"] = int(opposite.sum())
+    for a, b in zip(i[~opposite & ~same], j[~opposite & ~same]):
+        report["mismatched"].append(entry(owner[[a, b]], mid[a]))
+    for a, b in zip(i[same], j[same]):
+        report["overlaps"].append(entry(owner[[a, b]], mid[a]))
+    for members in _groups(group, np.flatnonzero(size > 2)):
+        report["overlaps"].append(entry(owner[members], mid[members[0]]))
+
+    # Corners: no more than a full turn of tile around any point
+    i, j = _pairs(corners, tolerance)
+    vertex = _components(len(corners), i, j)
+    total = np.bincount(vertex, weights=inner, minlength=len(corners))
+    crowded = np.flatnonzero(np.isin(vertex, np.flatnonzero(total > 360 + ANGLE_TOLERANCE)))
+    for members in _groups(vertex, crowded):
+        report["overlaps"].append(entry(owner[members], corners[members[0]]))
+
+    # Near misses: unshared edges whose midpoints almost meet
+    loose = np.flatnonzero(size == 1)
+    i, j = _pairs(mid[loose], NEAR_MISS) if len(loose) else (loose, loose)
+    for a, b in zip(loose[i], loose[j]):
+        if owner[a] != owner[b]:
+            report["mismatched"].append(entry(owner[[a, b]], (mid[a] + mid[b]) / 2))
+
+    # Tiles lying across each other
+    flagged = {tiles for tiles, _, _ in report["overlaps"]}
+    for a, b, where in _overlapping(names, types, x + 1j*y, angle, outlines, tolerance):
+        tiles = tuple(sorted((int(a), int(b))))
+        if tiles not in flagged:
+            flagged.add(tiles)
+            report["overlaps"].append(entry(np.array(tiles), where))
+
+    # Unshared edges chain into closed runs: the outlines go counterclockwise
+    # around tiles, holes clockwise around empty space.  Where runs touch at
+    # a corner, each edge goes on along the next edge met turning
+    # counterclockwise from the way it came, keeping the empty side apart.
+    open_edges = np.flatnonzero(size == 1)
+    tail, head = vertex[open_edges], vertex[ahead[open_edges]]
+    order = np.argsort(tail, kind="stable")
+    tails = tail[order]
+    first = np.searchsorted(tails, head, "left")
+    n = np.searchsorted(tails, head, "right") - first
+    e = np.repeat(np.arange(len(open_edges)), n)
+    f = order[np.repeat(first - np.cumsum(n) + n, n) + np.arange(n.sum())]
+    turn = np.angle(vec[open_edges[f]] / -vec[open_edges[e]]) % (2*np.pi)
+    pick = np.lexsort((turn, e))
+    pick = pick[np.r_[True, e[pick][1:] != e[pick][:-1]]] if len(pick) else pick
+    after = np.arange(len(open_edges))
+    after[e[pick]] = f[pick]
+    run = _components(len(open_edges), np.arange(len(open_edges)), after)
+    area = np.bincount(run, weights=(start[open_edges].conj() * end[open_edges]).imag / 2,
+                       minlength=len(open_edges))
+    for members in _groups(run, np.arange(len(open_edges))):
+        if area[run[members[0]]] > tolerance:
+            report["outlines"] += 1
+        else:
+            members = open_edges[members]
+            report["gaps"].append(entry(owner[members], mid[members].mean()))
+
+    report["ok"] = not (report["mismatched"] or report["overlaps"] or report["gaps"])
+    return report
+
+
+def validate(layout, side, tolerance=TOLERANCE):
+    """Check a layout of ``(tile, x, y, rotation)`` entries of tiles with ``side`` mm."""
+    names = sorted({name for name, *_ in layout})
+    code = {name: k for k, name in enumerate(names)}
+    types = [code[name] for name, *_ in layout]
+    _, x, y, rotation = zip(*layout) if layout else ((), (), (), ())
+    return check(names, types, x, y, rotation, side, tolerance)
+
+
+def validate_tiling(t, tolerance=TOLERANCE):
+    """Check a ``tiling`` array, thin rhombs included, positions in tile sides."""
+    return check(tiling.TYPES, t["type"], t["x"], t["y"], t["angle"], 1.0, tolerance)
+
+
+def summary(report, limit=10):
+    """The report as text, listing at most ``limit`` problems of each kind."""
+    lines = ["%d tiles, %d edges, %d shared, %d outline(s): %s" % (
+        report["tiles"], report["edges"], report["shared"], report["outlines"],
+        "ok" if report["ok"] else "INVALID")]
+    for kind in ("mismatched", "overlaps", "gaps"):
+        found = report[kind]
+        if found:
+            lines.append("%d %s" % (len(found), kind))
+        for tiles, x, y in found[:limit]:
+            lines.append("    at (%.3f, %.3f): tile(s) %s" % (x, y, ", ".join(map(str, tiles))))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check that a layout's tiles meet edge to edge.")
+    ap.add_argument("layout", help="layout CSV or JSON (see patch.read_layout)")
+    ap.add_argument("--side", type=float, default=50.8, help="tile side in mm")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE,
+                    help="distance, in tile sides, under which points coincide")
+    args = ap.parse_args(argv)
+
+    report = validate(tiling.read_layout(args.layout), args.side, args.tolerance)
+    sys.stdout.write(summary(report) + "\n")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())